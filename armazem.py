@@ -0,0 +1,342 @@
+"""
+Armazém local de chamados com atualização incremental.
+
+A exportação diária é cumulativa, mas só algumas centenas de chamados mudam de
+um dia para o outro. O armazém guarda os chamados já tratados em segmentos
+Arrow IPC, um por integração, e em cada linha um hash do 'ID' e das colunas que
+mudam ao longo do atendimento (Status, datas de solução e retorno, Log).
+
+Ao integrar uma nova exportação, essas colunas são lidas direto do XML da
+planilha, sem passar pelo openpyxl; só as linhas novas ou alteradas são lidas
+por inteiro (read_excel sobre uma cópia da planilha com apenas essas linhas),
+passam pela limpeza e viram um segmento novo. Na leitura vale a versão mais
+recente de cada chamado. Quando há segmentos demais, eles são compactados em um.
+"""
+import io
+import json
+import os
+import re
+import threading
+import uuid
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import unescape
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from config import PASTA_ARMAZEM
+from dados import VERSAO_LIMPEZA, chave_chamados, concatenar_chamados, ler_bytes, limpar_chamados, remover_repetidos
+
+ARQUIVO_ESTADO = "estado.json"
+# Colunas cujo conteúdo muda quando o chamado é atualizado (o Log registra o resto)
+COLUNAS_ALTERACAO = ['Status', 'Data Finalizado', 'Primeiro Retorno', 'Log']
+# Acima disso os segmentos são juntados em um só na próxima integração
+LIMITE_SEGMENTOS = 30
+
+_trava = threading.Lock()
+
+
+def _caminho(nome):
+    return os.path.join(PASTA_ARMAZEM, nome)
+
+
+def _estado_vazio():
+    return {'versao': 0, 'arquivos': [], 'segmentos': [], 'criado': uuid.uuid4().hex}
+
+
+def _ler_estado():
+    try:
+        with open(_caminho(ARQUIVO_ESTADO), encoding="utf-8") as arquivo:
+            estado = json.load(arquivo)
+    except (OSError, ValueError):
+        return _estado_vazio()
+    # Armazém criado com outra versão da limpeza (ou do formato): recomeça do zero
+    if estado.get('versao_limpeza') != VERSAO_LIMPEZA or 'segmentos' not in estado:
+        return _estado_vazio()
+    return estado
+
+
+def _gravar_estado(estado):
+    temporario = _caminho(ARQUIVO_ESTADO + ".tmp")
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(estado, arquivo)
+    os.replace(temporario, _caminho(ARQUIVO_ESTADO))
+
+
+def _gravar(df, nome):
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    temporario = _caminho(nome + ".tmp")
+    feather.write_feather(tabela, temporario, compression="uncompressed")
+    os.replace(temporario, _caminho(nome))
+
+
+# ---------------------------------------------------------
+# HASHES DAS LINHAS
+# ---------------------------------------------------------
+def _hashes(ids, alteracoes):
+    """
+    A partir dos textos das células: chave do ID, hash do ID + colunas de
+    alteração e quais linhas têm ID (as sem ID ficam de fora do armazém).
+    """
+    textos = pd.DataFrame({'ID': ids, **alteracoes}, dtype=object)
+    ids = textos['ID'].to_numpy()
+    chaves = pd.util.hash_array(ids)
+    return chaves, pd.util.hash_pandas_object(textos, index=False).to_numpy(), ids != ''
+
+
+def hash_linhas(bruto):
+    """Chave e hash de cada linha de uma exportação já lida pelo pandas."""
+    texto = lambda col: bruto[col].astype(object).where(bruto[col].notna(), '').map(str).to_numpy()
+    return _hashes(texto('ID'), {col: texto(col) for col in COLUNAS_ALTERACAO if col in bruto.columns})
+
+
+# ---------------------------------------------------------
+# LEITURA PARCIAL DA PLANILHA (XML)
+# ---------------------------------------------------------
+_LINHA = re.compile(rb'<row\b[^>]*?(?:/>|>.*?</row>)', re.S)
+_CELULA = re.compile(rb'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_TIPO = re.compile(rb'\bt="(\w+)"')
+_VALOR = re.compile(rb'<v>(.*?)</v>', re.S)
+_TEXTO = re.compile(rb'<t\b[^>]*>(.*?)</t>', re.S)
+_NUMERO_LINHA = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+
+def _texto_celula(atributos, conteudo, compartilhados):
+    tipo = _TIPO.search(atributos)
+    tipo = tipo.group(1) if tipo else b'n'
+    if not conteudo:
+        return ''
+    if tipo == b'inlineStr':
+        return unescape(b''.join(_TEXTO.findall(conteudo)).decode('utf-8'))
+    valor = _VALOR.search(conteudo)
+    if valor is None:
+        return ''
+    if tipo == b's':
+        return compartilhados[int(valor.group(1))]
+    return unescape(valor.group(1).decode('utf-8'))
+
+
+def _primeira_planilha(livro):
+    """Caminho, dentro do zip, da primeira planilha (a que o read_excel lê)."""
+    raiz = ET.fromstring(livro.read('xl/workbook.xml'))
+    rid = raiz.find(f'{_NS}sheets/{_NS}sheet').get(f'{_NS_REL}id')
+    relacoes = ET.fromstring(livro.read('xl/_rels/workbook.xml.rels'))
+    alvo = next(r.get('Target') for r in relacoes if r.get('Id') == rid)
+    return alvo.lstrip('/') if alvo.startswith('/') else 'xl/' + alvo
+
+
+def _textos_compartilhados(livro):
+    if 'xl/sharedStrings.xml' not in livro.namelist():
+        return []
+    with livro.open('xl/sharedStrings.xml') as arquivo:
+        return [''.join(t.text or '' for t in si.iter(f'{_NS}t')) for evento, si in ET.iterparse(arquivo)
+                if si.tag == f'{_NS}si']
+
+
+def _ler_alteracoes(conteudo):
+    """
+    Lê do XML só o 'ID' e as COLUNAS_ALTERACAO de cada linha. Devolve (livro,
+    caminho da planilha, XML da planilha, trechos das linhas, número na planilha
+    de cada linha de dados, chaves, hashes, linhas com ID), ou None se a planilha não tiver o formato esperado (aí vale
+    o read_excel da planilha inteira).
+    """
+    try:
+        livro = zipfile.ZipFile(io.BytesIO(conteudo))
+        caminho = _primeira_planilha(livro)
+        xml = livro.read(caminho)
+        compartilhados = _textos_compartilhados(livro)
+    except (zipfile.BadZipFile, KeyError, StopIteration, AttributeError, ET.ParseError):
+        return None
+
+    linhas = [m.span() for m in _LINHA.finditer(xml)]
+    if len(linhas) < 2:
+        return None
+    cabecalho = {}
+    for celula in _CELULA.finditer(xml, *linhas[0]):
+        ref = re.search(rb'\br="([A-Z]+)', celula.group(1))
+        if ref is None:
+            return None
+        cabecalho[ref.group(1)] = _texto_celula(celula.group(1), celula.group(2), compartilhados).strip()
+    colunas = {nome: letra for letra, nome in cabecalho.items()}
+    if 'ID' not in colunas or len(colunas) != len(cabecalho):
+        return None
+
+    # Uma busca na planilha inteira, só pelas células das colunas que interessam
+    alvos = {colunas[c]: c for c in ['ID'] + COLUNAS_ALTERACAO if c in colunas}
+    celulas = re.compile(rb'<c\b([^>]*?\br="(' + b'|'.join(alvos) + rb')(\d+)"[^>]*?)(?:/>|>(.*?)</c>)', re.S)
+    # Linha apagada no Excel some do XML: a numeração (r=) pode ter buracos
+    numeros = [_NUMERO_LINHA.match(xml, inicio) for inicio, _ in linhas]
+    if not all(numeros):
+        return None
+    numeros = [int(numero.group(1)) for numero in numeros]
+    if numeros[0] != 1:
+        return None  # cabeçalho fora da primeira linha: o read_excel decide
+    numeros = numeros[1:]
+    posicao = {numero: i for i, numero in enumerate(numeros)}
+    textos = {c: [''] * len(numeros) for c in alvos.values()}
+    for celula in celulas.finditer(xml, linhas[1][0]):
+        i = posicao.get(int(celula.group(3)))
+        if i is not None:
+            textos[alvos[celula.group(2)]][i] = _texto_celula(celula.group(1), celula.group(4), compartilhados)
+
+    ids = textos.pop('ID')
+    return (livro, caminho, xml, linhas, np.array(numeros)) + _hashes(ids, textos)
+
+
+def _inteiros_de_volta(bruto):
+    """
+    Colunas que o read_excel passou a float só por causa das linhas vazias
+    (apagadas no Excel) voltam a inteiro, como sairiam sem elas.
+    """
+    for col in bruto.select_dtypes('float').columns:
+        valores = bruto[col]
+        if valores.notna().all() and (valores % 1 == 0).all():
+            bruto[col] = valores.astype('int64')
+    return bruto
+
+
+def _ler_linhas(livro, caminho, xml, linhas, selecionadas):
+    """read_excel de uma cópia da planilha só com o cabeçalho e as linhas selecionadas."""
+    trechos = [xml[slice(*linhas[0])]]
+    for novo, i in enumerate(selecionadas, start=2):
+        trecho = xml[slice(*linhas[i + 1])]
+        trecho = re.sub(rb'(<row\b[^>]*?\br=")\d+', rb'\g<1>%d' % novo, trecho, count=1)
+        trechos.append(re.sub(rb'(<c\b[^>]*?\br="[A-Z]+)\d+', rb'\g<1>%d' % novo, trecho))
+    planilha = xml[:linhas[0][0]] + b''.join(trechos) + xml[linhas[-1][1]:]
+
+    copia = io.BytesIO()
+    with zipfile.ZipFile(copia, 'w', zipfile.ZIP_STORED) as saida:
+        for item in livro.infolist():
+            saida.writestr(item.filename, planilha if item.filename == caminho else livro.read(item))
+    return pd.read_excel(copia)
+
+
+# ---------------------------------------------------------
+# SEGMENTOS
+# ---------------------------------------------------------
+def _hashes_anteriores(estado):
+    """Hash mais recente de cada chave do ID já integrada ao armazém."""
+    tabelas = [feather.read_table(_caminho(s), columns=['__chave', '__hash'], memory_map=True)
+               for s in estado['segmentos']]
+    if not tabelas:
+        return pd.Series(dtype='uint64')
+    anteriores = pa.concat_tables(tabelas).to_pandas()
+    anteriores = anteriores.drop_duplicates('__chave', keep='last')
+    return pd.Series(anteriores['__hash'].to_numpy(), index=anteriores['__chave'].to_numpy())
+
+
+def _ler_segmentos(estado):
+    frames = [feather.read_table(_caminho(s), memory_map=True).to_pandas() for s in estado['segmentos']]
+    if not frames:
+        return None
+    # A versão mais recente de cada chamado vence; as datas inválidas são recontadas
+    return remover_repetidos(concatenar_chamados(frames))
+
+
+def _compactar(estado):
+    """Junta todos os segmentos em um só (só a última versão de cada chamado); devolve os antigos."""
+    nome = f"segmento-{estado['versao']:05d}-c.arrow"
+    _gravar(_ler_segmentos(estado), nome)
+    antigos, estado['segmentos'] = estado['segmentos'], [nome]
+    return antigos
+
+
+def _remover(arquivos):
+    for arquivo in arquivos:
+        try:
+            os.remove(_caminho(arquivo))
+        except OSError:
+            pass
+
+
+def chave_armazem():
+    """Identifica o conteúdo atual do armazém (None se vazio); muda se ele for recriado."""
+    estado = _ler_estado()
+    return f"{estado['criado']}-{estado['versao']}" if estado['versao'] else None
+
+
+def ler_armazem():
+    """Chamados tratados do armazém, ou None se ainda não houver nenhum."""
+    df = _ler_segmentos(_ler_estado())
+    if df is None:
+        return None
+    return df.drop(columns=['__chave', '__hash'])
+
+
+def atualizar_armazem(origem):
+    """
+    Integra uma exportação (caminho ou bytes) ao armazém. Devolve um resumo
+    {'novos', 'alterados', 'inalterados', 'total'} ou None se esse mesmo arquivo
+    já tinha sido integrado.
+    """
+    conteudo = ler_bytes(origem)
+    chave = chave_chamados(conteudo)
+
+    with _trava:
+        estado = _ler_estado()
+        if chave in estado['arquivos']:
+            return None
+
+        parcial = _ler_alteracoes(conteudo)
+        if parcial is None:
+            bruto = pd.read_excel(io.BytesIO(conteudo))
+            bruto.columns = bruto.columns.str.strip()
+            if 'ID' not in bruto.columns:
+                raise ValueError("A coluna 'ID' é necessária para a atualização incremental.")
+            chaves, hashes, com_id = hash_linhas(bruto)
+        else:
+            livro, caminho, xml, linhas, numeros, chaves, hashes, com_id = parcial
+
+        # Repetidos dentro da exportação: vale a última linha
+        ultima = com_id & ~pd.Series(chaves).duplicated(keep='last').to_numpy()
+        anteriores = _hashes_anteriores(estado)
+        # fill_value mantém o uint64 (com NaN o hash viraria float e perderia bits)
+        hash_anterior = anteriores.reindex(chaves, fill_value=0).to_numpy()
+        novos = ultima & ~pd.Index(chaves).isin(anteriores.index)
+        alterados = ultima & ~novos & (hash_anterior != hashes)
+        mudou = np.flatnonzero(novos | alterados)
+
+        resumo = {'novos': int(novos.sum()), 'alterados': int(alterados.sum()),
+                  'inalterados': int(ultima.sum() - len(mudou))}
+
+        descartados = []
+        if estado['versao'] == 0 and os.path.isdir(PASTA_ARMAZEM):
+            # Armazém recomeçando: os arquivos de antes não valem mais
+            descartados = [nome for nome in os.listdir(PASTA_ARMAZEM) if nome.endswith('.arrow')]
+        if len(mudou):
+            # Só as linhas novas/alteradas são lidas por inteiro e passam pela limpeza
+            if parcial is not None and (len(mudou) <= len(chaves) // 2 or not com_id.all()):
+                bruto = _ler_linhas(livro, caminho, xml, linhas, mudou)
+            else:
+                # Quase tudo mudou (ex.: primeira integração): a cópia não compensa.
+                # O read_excel preenche as linhas que faltam no XML com vazios, então a
+                # posição dele vem do número da linha na planilha, não da ordem no XML
+                if parcial is not None:
+                    bruto = pd.read_excel(io.BytesIO(conteudo))
+                    bruto = _inteiros_de_volta(bruto.iloc[numeros[mudou] - 2].reset_index(drop=True))
+                else:
+                    bruto = bruto.iloc[mudou].reset_index(drop=True)
+            tratados = limpar_chamados(bruto).assign(__chave=chaves[mudou], __hash=hashes[mudou])
+
+            os.makedirs(PASTA_ARMAZEM, exist_ok=True)
+            _remover(descartados)
+            descartados = []
+            estado['versao'] += 1
+            nome = f"segmento-{estado['versao']:05d}.arrow"
+            _gravar(tratados, nome)
+            estado['segmentos'].append(nome)
+            if len(estado['segmentos']) > LIMITE_SEGMENTOS:
+                descartados = _compactar(estado)
+
+        resumo['total'] = len(anteriores.index.union(pd.Index(chaves[mudou])))
+        estado['versao_limpeza'] = VERSAO_LIMPEZA
+        estado['arquivos'].append(chave)
+        os.makedirs(PASTA_ARMAZEM, exist_ok=True)
+        _gravar_estado(estado)
+        _remover(descartados)  # só depois que o estado novo já não aponta para eles
+        return resumo
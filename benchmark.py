@@ -0,0 +1,247 @@
+"""
+Benchmark do pipeline: carga, filtros, mineração de texto, SLA e render do main.py.
+
+Para cada tamanho, gera uma exportação sintética (gerador.py), mede o tempo de
+cada etapa (menor tempo e mediana de N repetições) e o pico de memória alocada
+(tracemalloc, numa execução à parte) e grava tudo em JSON. Com --comparar, mostra
+a razão entre os tempos desta execução e os de um resultado anterior.
+
+Uso: python benchmark.py --linhas 10000 100000 --saida resultados.json [--comparar anterior.json]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import matplotlib
+
+matplotlib.use('Agg')  # sem janela: o render é medido até o savefig
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import snapshot
+from config import MOTOR
+from cubo import construir_cubo, fatiar, maximo, media, somar_por
+from dados import carregar_varios, filtrar_chamados, limpar_chamados
+from gerador import LIMITE_LINHAS_EXCEL, gerar_chamados, salvar
+from incidentes import calcular_assinaturas, detectar_incidentes
+from motor import MOTORES
+from quantis import construir_esbocos, quantis
+from texto import analisar_texto, construir_indice
+
+VERSAO_RESULTADOS = 1
+# Acima disso o read_excel leva minutos: a carga do .xlsx só é medida até aqui
+LIMITE_EXCEL_PADRAO = 200_000
+
+
+def medir(funcao, repeticoes):
+    """Executa 'funcao' N vezes e devolve (tempos, último resultado)."""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos, resultado
+
+
+def pico_memoria(funcao):
+    """Pico de memória alocada (MB) durante uma execução, medido com tracemalloc."""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    finally:
+        tracemalloc.stop()
+
+
+def etapas(bruto, arquivo_excel, pasta_snapshot, motor=None):
+    """
+    Etapas medidas, em ordem, como (nome, função). Cada função recebe o estado
+    das anteriores através do dicionário 'estado'.
+    """
+    estado = {}
+
+    def limpar():
+        estado['df'] = limpar_chamados(bruto.copy(), motor)
+        return estado['df']
+
+    def filtros():
+        df = estado['df']
+        # Seleção típica: metade final do período, duas prioridades, só finalizados
+        inicio, fim = df['Data_Dia'].quantile(0.5), df['Data_Dia'].max()
+        estado['periodo'] = (inicio, fim)
+        estado['linhas'] = filtrar_chamados(df, estado['periodo'], ['Média', 'Alta'], ['Finalizado'], motor)
+        return estado['linhas']
+
+    def filtros_cubo():
+        return somar_por(fatiar(estado['cubo'], estado['periodo'], ['Média', 'Alta'], ['Finalizado']), 'Subcategoria')
+
+    def sla_linhas():
+        # Como o dashboard fazia antes do cubo e dos esboços: sobre as linhas filtradas
+        sla = estado['df']['SLA_Solucao_Horas'].to_numpy()[estado['linhas']]
+        return np.nanmean(sla), np.nanmedian(sla), np.nanmax(sla), np.nanpercentile(sla, [90, 95, 99])
+
+    def sla_agregados():
+        fatia = fatiar(estado['cubo'], estado['periodo'], ['Média', 'Alta'], ['Finalizado'])
+        esboco = fatiar(estado['esbocos']['Solucao'], estado['periodo'], ['Média', 'Alta'], ['Finalizado'])
+        return media(fatia, 'Solucao'), maximo(fatia, 'Solucao'), quantis(esboco), quantis(esboco, grupo='Prioridade')
+
+    def render_main():
+        # Import tardio: o main.py configura o seaborn ao desenhar
+        import matplotlib.pyplot as plt
+        from main import contagens_em_memoria, desenhar_relatorio
+
+        fig = desenhar_relatorio(contagens_em_memoria(estado['df'], motor=motor), "benchmark")
+        fig.savefig(io.BytesIO(), dpi=100, format='png')
+        plt.close(fig)
+
+    lista = []
+    if arquivo_excel is not None:
+        def carregar(pasta):
+            # Mesmo carregamento do site, com a pasta de snapshots indicada
+            pasta_anterior, snapshot.PASTA_CACHE = snapshot.PASTA_CACHE, pasta
+            try:
+                return carregar_varios([arquivo_excel], motor=motor)
+            finally:
+                snapshot.PASTA_CACHE = pasta_anterior
+
+        def load_data_frio():
+            with tempfile.TemporaryDirectory() as pasta:
+                return carregar(pasta)
+
+        carregar(pasta_snapshot)  # grava o snapshot fora da medida: a etapa seguinte só lê
+
+        lista += [('load_data (xlsx)', load_data_frio), ('load_data (snapshot)', lambda: carregar(pasta_snapshot))]
+
+    lista += [
+        ('limpar_chamados', limpar),
+        ('construir_cubo', lambda: estado.__setitem__('cubo', construir_cubo(estado['df'], motor))),
+        ('construir_esbocos', lambda: estado.__setitem__('esbocos', construir_esbocos(estado['df']))),
+        ('construir_indice', lambda: estado.__setitem__('indice', construir_indice(estado['df']['Assunto']))),
+        ('calcular_assinaturas', lambda: estado.__setitem__('assinaturas', calcular_assinaturas(estado['df']['Assunto']))),
+        ('filtros (mascaras)', filtros),
+        ('filtros (cubo)', filtros_cubo),
+        ('analisar_texto (tudo)', lambda: analisar_texto(estado['indice'])),
+        ('analisar_texto (filtro)', lambda: analisar_texto(estado['indice'], estado['linhas'], bigramas=True)),
+        ('sla (linhas)', sla_linhas),
+        ('sla (cubo + esbocos)', sla_agregados),
+        ('detectar_incidentes', lambda: detectar_incidentes(estado['df'], estado['assinaturas'], estado['linhas'])),
+        ('render main.py', render_main),
+    ]
+    return lista
+
+
+def executar(tamanhos, repeticoes, pasta, limite_excel, semente, motor=None):
+    resultados = []
+    for linhas in tamanhos:
+        print(f"\n== {linhas:,} chamados ==")
+        inicio = time.perf_counter()
+        bruto = gerar_chamados(linhas, semente)
+        print(f"  (gerados em {time.perf_counter() - inicio:.1f}s)")
+
+        arquivo_excel = None
+        if linhas <= min(limite_excel, LIMITE_LINHAS_EXCEL):
+            arquivo_excel = os.path.join(pasta, f"sinteticos_{linhas}_{semente}.xlsx")
+            if not os.path.exists(arquivo_excel):
+                salvar(bruto, arquivo_excel)
+
+        with tempfile.TemporaryDirectory(prefix="benchmark_snapshot_") as pasta_snapshot:
+            for nome, funcao in etapas(bruto, arquivo_excel, pasta_snapshot, motor):
+                tempos, _ = medir(funcao, repeticoes)
+                pico = pico_memoria(funcao)
+                resultados.append({
+                    'linhas': linhas,
+                    'etapa': nome,
+                    'segundos_min': round(min(tempos), 6),
+                    'segundos_mediana': round(statistics.median(tempos), 6),
+                    'repeticoes': repeticoes,
+                    'pico_mb': round(pico, 2),
+                })
+                print(f"  {nome:<26}{min(tempos) * 1000:>10.1f} ms{pico:>10.1f} MB")
+    return resultados
+
+
+def versao_git():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, anterior):
+    """Imprime a razão entre os tempos (atual / anterior) das etapas em comum."""
+    base = {(r['linhas'], r['etapa']): r for r in anterior['resultados']}
+    print(f"\nComparação com {anterior.get('commit') or '?'} ({anterior.get('gerado_em')}): atual / anterior")
+    for r in atual:
+        antes = base.get((r['linhas'], r['etapa']))
+        if antes and antes['segundos_min'] > 0:
+            razao = r['segundos_min'] / antes['segundos_min']
+            aviso = "  <-- mais lento" if razao > 1.2 else ""
+            print(f"  {r['linhas']:>10,} {r['etapa']:<26}{razao:>7.2f}x{aviso}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de chamados")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Tamanhos das exportações sintéticas (10 mil a 10 milhões)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--pasta", default=os.path.join(tempfile.gettempdir(), "benchmark_chamados"),
+                        help="Onde guardar as planilhas geradas (reaproveitadas entre execuções)")
+    parser.add_argument("--limite-excel", type=int, default=LIMITE_EXCEL_PADRAO,
+                        help="Maior tamanho em que a carga do .xlsx é medida")
+    parser.add_argument("--motor", choices=MOTORES, default=MOTOR,
+                        help="Motor da limpeza, dos filtros e das agregações")
+    parser.add_argument("--saida", default="resultados_benchmark.json")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+    resultados = executar(args.linhas, args.repeticoes, args.pasta, args.limite_excel, args.semente, args.motor)
+
+    relatorio = {
+        'versao': VERSAO_RESULTADOS,
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'commit': versao_git(),
+        'ambiente': {
+            'python': sys.version.split()[0],
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'pyarrow': pa.__version__,
+            'plataforma': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        # Pico de memória residente do processo inteiro (KB no Linux)
+        'rss_maximo_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None,
+        'semente': args.semente,
+        'motor': args.motor,
+        'resultados': resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em '{args.saida}'.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(resultados, json.load(arquivo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Configurações compartilhadas entre o dashboard (site.py) e o relatório (main.py).
+Cada valor pode ser sobrescrito por uma variável de ambiente.
+"""
+import os
+
+# Pasta onde ficam os snapshots colunares (Arrow IPC) das planilhas já tratadas
+PASTA_CACHE = os.environ.get("RELATORIO_CACHE_DIR", ".cache_chamados")
+
+# Orçamento de memória (em MB) do registro de datasets compartilhado entre as sessões
+LIMITE_MEMORIA_MB = int(os.environ.get("RELATORIO_LIMITE_MEMORIA_MB", "1024"))
+
+# Arquivo com as stopwords da mineração de texto (uma palavra por linha)
+ARQUIVO_STOPWORDS = os.environ.get(
+    "RELATORIO_STOPWORDS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords.txt")
+)
+
+# Pasta do armazém local de chamados (atualização incremental por ID)
+PASTA_ARMAZEM = os.environ.get("RELATORIO_ARMAZEM_DIR", ".armazem_chamados")
+
+# Motor de execução da limpeza, dos filtros e das agregações: 'pandas' ou 'arrow' (motor.py)
+MOTOR = os.environ.get("RELATORIO_MOTOR", "pandas")
+
+# Log de desempenho: uma linha JSON por etapa medida ('-' para o stderr; vazio desliga)
+LOG_DESEMPENHO = os.environ.get("RELATORIO_LOG_DESEMPENHO", "")
@@ -0,0 +1,58 @@
+"""
+Cubo pré-agregado dos chamados (dia x Status x Prioridade x Subcategoria).
+
+Construído uma única vez no carregamento. Os KPIs e os gráficos que não precisam
+de linha a linha são respondidos filtrando e somando o cubo, cujo tamanho depende
+das combinações existentes e não da quantidade de chamados.
+"""
+import pandas as pd
+
+from dados import filtrar_chamados
+from motor import agrupar
+
+DIMENSOES = ['Data_Dia', 'Status', 'Prioridade', 'Subcategoria']
+
+
+def construir_cubo(df, motor=None, tabela=None):
+    """
+    Agrega contagem e somas/contagens válidas de SLA por combinação das dimensões
+    ('tabela': ver motor.tabela_consulta).
+    """
+    dimensoes = [c for c in DIMENSOES if c in df.columns]
+    if not dimensoes:
+        return pd.DataFrame({'Qtd': [len(df)]})
+
+    medidas = [('Qtd', None, 'qtd')]
+    for col, nome in [('SLA_Solucao_Horas', 'Solucao'), ('SLA_Resposta_Horas', 'Resposta')]:
+        if col in df.columns:
+            medidas += [(f'Soma_{nome}', col, 'soma'), (f'Validos_{nome}', col, 'validos'), (f'Max_{nome}', col, 'max')]
+
+    # Vazios formam grupo próprio: os chamados sem data válida contam quando não há filtro de período
+    return agrupar(df, dimensoes, medidas, motor, tabela)
+
+
+def fatiar(cubo, periodo=None, prioridades=None, status=None):
+    """Aplica os filtros da barra lateral sobre as células do cubo."""
+    # O cubo é pequeno: o pandas responde sem o custo de passar as colunas para o Arrow
+    return cubo.take(filtrar_chamados(cubo, periodo, prioridades, status, motor='pandas'))
+
+
+def somar_por(fatia, dimensao):
+    """Quantidade de chamados por valor da dimensão, do maior para o menor."""
+    qtd = fatia.groupby(dimensao, observed=True)['Qtd'].sum()
+    return qtd[qtd > 0].sort_values(ascending=False, kind='stable')
+
+
+def media(fatia, nome):
+    """Média do SLA (nome = 'Solucao' ou 'Resposta') a partir das somas do cubo."""
+    validos = fatia[f'Validos_{nome}'].sum() if f'Validos_{nome}' in fatia.columns else 0
+    if validos == 0:
+        return None
+    return fatia[f'Soma_{nome}'].sum() / validos
+
+
+def maximo(fatia, nome):
+    """Maior SLA (nome = 'Solucao' ou 'Resposta') entre as células do cubo."""
+    if f'Max_{nome}' not in fatia.columns or fatia[f'Max_{nome}'].isna().all():
+        return None
+    return float(fatia[f'Max_{nome}'].max())
@@ -0,0 +1,175 @@
+"""
+Carregamento e limpeza dos chamados, compartilhado por site.py e main.py.
+"""
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import snapshot
+from esquema import aplicar_esquema, normalizar_colunas_mistas, registrar_datas_invalidas
+from motor import filtrar, limpar
+
+# Aumente sempre que a lógica de limpeza mudar: invalida os snapshots antigos
+VERSAO_LIMPEZA = 4
+
+
+def ler_bytes(origem):
+    """Aceita caminho do arquivo ou arquivo enviado pelo Streamlit e devolve os bytes."""
+    if isinstance(origem, (bytes, bytearray)):
+        return bytes(origem)
+    if hasattr(origem, "getvalue"):
+        return origem.getvalue()
+    with open(origem, "rb") as arquivo:
+        return arquivo.read()
+
+
+def limpar_chamados(df, motor=None):
+    """
+    Aplica o tratamento padrão (nomes de colunas, datas, SLA, textos e tipos do
+    esquema) com o motor configurado (motor.py).
+    """
+    return limpar(df, motor)
+
+
+def concatenar_chamados(frames):
+    """
+    Junta frames já tratados mantendo o esquema: categóricos com categorias
+    diferentes são unidos pelos códigos, sem voltar a texto.
+    """
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame()
+    # Coluna toda vazia em um frame (ex.: um lote pequeno do armazém) fica com o tipo dos demais
+    tipos = {}
+    for f in frames:
+        for col in f.columns:
+            if col not in tipos and f[col].notna().any():
+                tipos[col] = f[col].dtype
+    frames = [f.astype({col: tipos[col] for col in f.columns
+                        if col in tipos and f[col].dtype != tipos[col] and f[col].isna().all()})
+              for f in frames]
+    categoricas = [col for col in frames[0].columns
+                   if all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames)]
+
+    df = pd.concat(frames, ignore_index=True)
+    for col in categoricas:
+        df[col] = union_categoricals([f[col] for f in frames])
+    registrar_datas_invalidas(df, _juntar_posicoes(frames))
+    return aplicar_esquema(normalizar_colunas_mistas(df))
+
+
+def _juntar_posicoes(frames):
+    """Posições das datas não reconhecidas de cada frame, deslocadas para o frame concatenado."""
+    total, inicio = {}, 0
+    for frame in frames:
+        for col, posicoes in frame.attrs.get('posicoes_datas_invalidas', {}).items():
+            total.setdefault(col, []).extend(p + inicio for p in posicoes)
+        inicio += len(frame)
+    return total
+
+
+def remover_repetidos(df):
+    """
+    Mantém só a última versão de cada chamado (mesmo 'ID'; linhas sem ID ficam
+    todas; sem a coluna, linhas idênticas). É a mesma regra do fluxo.contar_em_fluxo.
+    As datas não reconhecidas são recontadas nas linhas que ficaram.
+    """
+    if 'ID' in df.columns:
+        repetidos = (df.duplicated(subset='ID', keep='last') & df['ID'].notna()).to_numpy()
+    else:
+        repetidos = df.duplicated(keep='last').to_numpy()
+    if not repetidos.any():
+        return df.reset_index(drop=True)
+    mantidas = np.flatnonzero(~repetidos)
+    nova_posicao = np.full(len(df), -1)
+    nova_posicao[mantidas] = np.arange(len(mantidas))
+
+    posicoes = {col: nova_posicao[np.asarray(pos, dtype=np.int64)]
+                for col, pos in df.attrs.get('posicoes_datas_invalidas', {}).items()}
+    df = df.take(mantidas).reset_index(drop=True)
+    return registrar_datas_invalidas(df, {col: pos[pos >= 0] for col, pos in posicoes.items()})
+
+
+def chave_chamados(conteudo):
+    """Identifica a planilha pelo conteúdo e pela versão da limpeza."""
+    return snapshot.chave_snapshot(conteudo, VERSAO_LIMPEZA)
+
+
+def carregar_chamados(origem, motor=None):
+    """
+    Lê a planilha de chamados já tratada.
+
+    Se a mesma planilha (mesmo conteúdo) já foi processada com a versão atual da
+    limpeza, o resultado vem do snapshot em disco; senão lê o Excel, limpa e salva.
+    Os dois motores produzem o mesmo resultado, então o snapshot serve para ambos.
+    """
+    conteudo = ler_bytes(origem)
+    chave = chave_chamados(conteudo)
+
+    df = snapshot.ler_snapshot(chave)
+    if df is not None:
+        return df
+
+    df = limpar_chamados(pd.read_excel(io.BytesIO(conteudo)), motor)
+    snapshot.salvar_snapshot(chave, df)
+    return df
+
+
+def listar_planilhas(origens, extensoes=('.xlsx',)):
+    """Expande pastas em arquivos (ordem alfabética); arquivos avulsos ficam como estão."""
+    arquivos = []
+    for origem in origens:
+        if isinstance(origem, str) and os.path.isdir(origem):
+            arquivos.extend(sorted(os.path.join(origem, nome) for nome in os.listdir(origem)
+                                   if nome.lower().endswith(extensoes) and not nome.startswith('~$')))
+        else:
+            arquivos.append(origem)
+    return arquivos
+
+
+def _carregar_cronometrado(nome, origem, motor=None):
+    # Executado em um processo separado: parse do openpyxl + limpeza
+    inicio = time.perf_counter()
+    df = carregar_chamados(origem, motor)
+    return nome, df, time.perf_counter() - inicio
+
+
+def carregar_varios(origens, nomes=None, processos=None, motor=None):
+    """
+    Carrega várias planilhas em paralelo (uma por processo) e junta o resultado.
+
+    'origens' são caminhos (ou bytes de arquivos enviados, com os 'nomes' ao lado).
+    Chamados repetidos (mesmo 'ID', no mesmo arquivo ou entre arquivos) ficam com
+    a última linha, na ordem da lista. Devolve o DataFrame e o tempo de carga de cada arquivo.
+    """
+    if nomes is None:
+        nomes = [os.path.basename(o) if isinstance(o, str) else f"arquivo {i + 1}" for i, o in enumerate(origens)]
+    if not origens:
+        raise ValueError("Nenhuma planilha informada.")
+
+    if len(origens) == 1:
+        resultados = [_carregar_cronometrado(nomes[0], origens[0], motor)]
+    else:
+        processos = processos or min(len(origens), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(_carregar_cronometrado, nomes, origens, [motor] * len(origens)))
+
+    tempos = pd.DataFrame([{'Arquivo': nome, 'Linhas': len(df), 'Segundos': segundos}
+                           for nome, df, segundos in resultados])
+    if len(resultados) == 1:
+        return remover_repetidos(resultados[0][1]), tempos
+
+    return remover_repetidos(concatenar_chamados([df for _, df, _ in resultados])), tempos
+
+
+def filtrar_chamados(df, periodo=None, prioridades=None, status=None, motor=None, tabela=None):
+    """
+    Aplica os filtros da barra lateral e devolve as posições (índices inteiros)
+    das linhas selecionadas, sem copiar o DataFrame ('tabela': ver motor.tabela_consulta).
+    """
+    return filtrar(df, periodo, prioridades, status, motor, tabela)
@@ -0,0 +1,156 @@
+"""
+Conversão das colunas de data das exportações, compartilhada por dados.py e fluxo.py.
+
+As exportações misturam textos no padrão brasileiro (28/11/2025 14:30), números
+de série do Excel, datas ISO e marcadores de vazio como '-'. Em vez de deixar o
+pd.to_datetime adivinhar valor a valor, cada valor distinto é convertido uma
+única vez: o formato dominante é detectado numa amostra e convertido de forma
+vetorizada, e só o que sobra passa pelos formatos seguintes.
+"""
+import numpy as np
+import pandas as pd
+
+# Tentados nessa ordem; o primeiro é o da exportação do sistema de chamados
+FORMATOS_TEXTO = ['%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y', 'ISO8601']
+MARCADORES_VAZIO = {'', '-', '--', 'nan', 'nat', 'none', 'null'}
+
+# Data zero do Excel (considera o 29/02/1900 que ele conta por engano)
+ORIGEM_EXCEL = pd.Timestamp('1899-12-30')
+# Faixa aceita como número de série: 01/01/1900 a 31/12/2199
+SERIE_EXCEL_MIN, SERIE_EXCEL_MAX = 1, 109_574
+TAMANHO_AMOSTRA = 200
+NUMERO_TEXTO = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+
+
+def _serie_excel(numeros):
+    """Números de série do Excel (dias, com a hora na fração) para datetime64."""
+    numeros = np.asarray(numeros, dtype='float64')
+    validos = (numeros >= SERIE_EXCEL_MIN) & (numeros <= SERIE_EXCEL_MAX)
+    nanossegundos = np.round(np.where(validos, numeros, 0) * 86_400) * 1_000_000_000
+    datas = ORIGEM_EXCEL.to_datetime64() + nanossegundos.astype('int64').astype('timedelta64[ns]')
+    return np.where(validos, datas, np.datetime64('NaT'))
+
+
+def _converter_formato(textos, formato):
+    """pd.to_datetime num formato (NaT onde não serve), sempre sem fuso horário."""
+    try:
+        datas = pd.to_datetime(textos, format=formato, errors='coerce')
+    except ValueError:
+        # ISO com e sem fuso misturados: tudo vai para UTC e o fuso sai
+        datas = pd.to_datetime(textos, format=formato, errors='coerce', utc=True)
+    return datas.tz_convert(None) if datas.tz is not None else datas
+
+
+def detectar_formato(textos, formatos=FORMATOS_TEXTO):
+    """Formato que converte mais valores de uma amostra dos textos (None se nenhum servir)."""
+    amostra = textos[:TAMANHO_AMOSTRA]
+    melhor, acertos_melhor = None, 0
+    for formato in formatos:
+        acertos = _converter_formato(amostra, formato).notna().sum()
+        if acertos > acertos_melhor:
+            melhor, acertos_melhor = formato, acertos
+    return melhor
+
+
+def _converter_distintos(valores):
+    """Converte um array de valores distintos (object) para datetime64[ns]."""
+    resultado = np.full(len(valores), np.datetime64('NaT'), dtype='datetime64[ns]')
+    if len(valores) == 0:
+        return resultado
+
+    if pd.api.types.infer_dtype(valores, skipna=True) == 'string':
+        # Caso comum (coluna só de texto): nada a separar valor a valor
+        restantes = np.arange(len(valores))
+        textos = pd.Series(valores, dtype='str').str.strip()
+    else:
+        # Datas de verdade (células formatadas como data no Excel) passam direto
+        eh_data = np.fromiter((isinstance(v, (pd.Timestamp, np.datetime64)) or hasattr(v, 'year') for v in valores),
+                              dtype=bool, count=len(valores))
+        if eh_data.any():
+            resultado[eh_data] = pd.to_datetime(pd.Series(valores[eh_data], dtype=object), errors='coerce').to_numpy()
+
+        eh_numero = np.fromiter((isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in valores),
+                                dtype=bool, count=len(valores)) & ~eh_data
+        if eh_numero.any():
+            resultado[eh_numero] = _serie_excel(valores[eh_numero].astype('float64'))
+
+        restantes = np.flatnonzero(~eh_data & ~eh_numero)
+        textos = pd.Series(valores[restantes], dtype=object).astype(str).str.strip()
+
+    # Texto numérico ('45991.5') também é número de série; o to_numeric só vê
+    # os textos com cara de número
+    numeros = np.full(len(textos), np.nan)
+    candidatos = textos.str.fullmatch(NUMERO_TEXTO).to_numpy(dtype=bool)
+    numeros[candidatos] = pd.to_numeric(textos[candidatos], errors='coerce').to_numpy(dtype='float64')
+    textos = textos.to_numpy(dtype=object)
+    eh_serie = ~np.isnan(numeros)
+    resultado[restantes[eh_serie]] = _serie_excel(numeros[eh_serie])
+    restantes, textos = restantes[~eh_serie], textos[~eh_serie]
+
+    # O formato dominante primeiro (vetorizado); cada formato seguinte só vê o que sobrou
+    formatos = list(FORMATOS_TEXTO)
+    dominante = detectar_formato(textos, formatos)
+    if dominante is not None:
+        formatos.remove(dominante)
+        formatos.insert(0, dominante)
+    for formato in formatos:
+        if len(textos) == 0:
+            break
+        convertidos = _converter_formato(textos, formato)
+        ok = np.asarray(convertidos.notna())
+        resultado[restantes[ok]] = convertidos[ok].to_numpy(dtype='datetime64[ns]')
+        restantes, textos = restantes[~ok], textos[~ok]
+
+    # Último recurso, valor a valor, apenas para os poucos textos que sobraram
+    if len(textos):
+        for posicao, texto in zip(restantes, textos):
+            if texto.lower() in MARCADORES_VAZIO:
+                continue
+            try:
+                resultado[posicao] = pd.Timestamp(pd.to_datetime(texto, dayfirst=True)).tz_localize(None).to_datetime64()
+            except (ValueError, TypeError, OverflowError):
+                pass
+    return resultado
+
+
+def eh_vazio(valores):
+    """Marca os valores que representam 'sem data' (nulos e marcadores como '-')."""
+    valores = pd.Series(valores, dtype=object)
+    vazios = valores.isna().to_numpy().copy()
+    textos = ~vazios & valores.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    vazios[textos] = valores[textos].str.strip().str.lower().isin(MARCADORES_VAZIO).to_numpy()
+    return vazios
+
+
+def converter_datas(serie, posicoes=False):
+    """
+    Converte uma coluna de datas no padrão brasileiro. Devolve (datas, invalidos):
+    a Series datetime64[ns] (NaT onde não há data) e quantos valores preenchidos
+    não puderam ser convertidos (marcadores como '-' não contam). Com
+    posicoes=True, 'invalidos' traz as posições dessas linhas em vez da contagem.
+    """
+    if not isinstance(serie, pd.Series):
+        serie = pd.Series(serie, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie.astype('datetime64[ns]'), (np.empty(0, dtype=np.int64) if posicoes else 0)
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        datas = _serie_excel(serie.to_numpy(dtype='float64', na_value=np.nan))
+        falhou = serie.notna().to_numpy() & np.isnat(datas)
+        invalidos = np.flatnonzero(falhou) if posicoes else int(falhou.sum())
+        return pd.Series(datas, index=serie.index, name=serie.name), invalidos
+
+    # Cada valor distinto é convertido uma vez e o resultado volta pelos códigos
+    codigos, distintos = pd.factorize(serie.astype(object), use_na_sentinel=True)
+    distintos = np.asarray(distintos, dtype=object)
+    convertidos = _converter_distintos(distintos)
+
+    # Só os que não viraram data podem ser marcadores de vazio
+    falhou = np.isnat(convertidos)
+    falhou[falhou] = ~eh_vazio(distintos[falhou])
+    if posicoes:
+        invalidos = np.flatnonzero((codigos >= 0) & falhou[np.maximum(codigos, 0)])
+    else:
+        invalidos = int(np.bincount(codigos[codigos >= 0], minlength=len(distintos))[falhou].sum())
+
+    datas = np.where(codigos >= 0, convertidos[codigos], np.datetime64('NaT'))
+    return pd.Series(datas.astype('datetime64[ns]'), index=serie.index, name=serie.name), invalidos
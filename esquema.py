@@ -0,0 +1,61 @@
+"""
+Esquema tipado dos chamados.
+
+Campos de baixa cardinalidade viram categóricos (códigos inteiros + tabela de
+rótulos), o dia de abertura vira datetime64 à meia-noite e as horas de SLA ficam
+em float32. Filtros (isin, ==) e contagens passam a trabalhar sobre os códigos
+em vez de comparar objetos str do Python.
+"""
+import pandas as pd
+
+COLUNAS_DATA = ['Data Abertura', 'Data Finalizado', 'Primeiro Retorno']
+COLUNAS_CATEGORICAS = ['Status', 'Subcategoria', 'Prioridade', 'PDV', 'Assunto', 'Categoria']
+COLUNAS_SLA = ['SLA_Solucao_Horas', 'SLA_Resposta_Horas']
+
+# Ordem lógica das prioridades usada nos gráficos
+ORDEM_PRIORIDADE = ['Baixa', 'Média', 'Alta', 'Crítica']
+
+
+def aplicar_esquema(df):
+    """Converte as colunas conhecidas para os tipos compactos (as demais ficam como estão)."""
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    # O pandas não tem datetime64[D]; o dia fica como datetime64 normalizado (00:00)
+    if 'Data Abertura' in df.columns:
+        df['Data_Dia'] = df['Data Abertura'].dt.normalize()
+
+    for col in COLUNAS_SLA:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+
+    return df
+
+
+def normalizar_colunas_mistas(df):
+    """
+    Colunas como 'Quantidade' misturam números e '-'. O formato colunar exige
+    um tipo só, então elas viram texto (valores vazios continuam vazios).
+    """
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def registrar_datas_invalidas(df, posicoes):
+    """
+    Guarda nos df.attrs as datas não reconhecidas de cada coluna: a contagem
+    ('datas_invalidas') e as posições das linhas ('posicoes_datas_invalidas'),
+    usadas para recontar depois de juntar arquivos ou remover repetidos.
+    """
+    posicoes = {col: [int(p) for p in pos] for col, pos in posicoes.items()}
+    df.attrs['datas_invalidas'] = {col: len(pos) for col, pos in posicoes.items()}
+    df.attrs['posicoes_datas_invalidas'] = posicoes
+    return df
+
+
+def memoria_por_coluna(df):
+    """Bytes ocupados por coluna (incluindo o conteúdo das strings), do maior para o menor."""
+    return df.memory_usage(deep=True, index=False).sort_values(ascending=False)
@@ -0,0 +1,156 @@
+"""
+Leitura em fluxo (streaming) para o relatório do main.py.
+
+Lê a planilha linha a linha (openpyxl em modo read-only, ou CSV/Parquet),
+mantém apenas as colunas necessárias e atualiza os contadores de Status,
+Subcategoria, Prioridade e abertura por dia a cada lote. O consumo de memória
+depende do tamanho do lote e da quantidade de valores distintos, não do total
+de linhas; com a coluna 'ID', guarda também uma tupla curta por chamado, para
+que um chamado repetido conte só pela última linha.
+"""
+import csv
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from datas import converter_datas
+
+COLUNAS_FLUXO = ['Status', 'Data Abertura', 'Subcategoria', 'Prioridade']
+# Lida quando existir, para remover chamados repetidos (nos arquivos e entre eles)
+COLUNA_ID = 'ID'
+TAMANHO_LOTE = 50_000
+
+
+def _texto(valor):
+    # Mesmo resultado de astype(str).str.strip() sobre o que o read_excel devolveria;
+    # célula vazia vira None (o astype(str) do pandas mantém o NaN e a contagem o ignora)
+    if pd.isna(valor) or valor == '':
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _lotes_excel(caminho, tamanho_lote):
+    from openpyxl import load_workbook
+
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [str(c).strip() if c is not None else '' for c in next(linhas, ())]
+        yield from _lotes_de_linhas(cabecalho, linhas, tamanho_lote)
+    finally:
+        livro.close()
+
+
+def _lotes_csv(caminho, tamanho_lote):
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        linhas = csv.reader(arquivo)
+        cabecalho = [c.strip() for c in next(linhas, [])]
+        yield from _lotes_de_linhas(cabecalho, linhas, tamanho_lote)
+
+
+def _lotes_parquet(caminho, tamanho_lote):
+    import pyarrow.parquet as pq
+
+    arquivo = pq.ParquetFile(caminho)
+    nomes = {nome.strip(): nome for nome in arquivo.schema_arrow.names}
+    _verificar_colunas(nomes)
+    colunas = COLUNAS_FLUXO + ([COLUNA_ID] if COLUNA_ID in nomes else [])
+    for lote in arquivo.iter_batches(batch_size=tamanho_lote, columns=[nomes[c] for c in colunas]):
+        yield {col: lote.column(nomes[col]).to_pylist() for col in colunas}
+
+
+def _verificar_colunas(disponiveis):
+    for col in COLUNAS_FLUXO:
+        if col not in disponiveis:
+            raise ValueError(f"A coluna '{col}' não foi encontrada no Excel. Verifique se o nome está exato.")
+
+
+def _lotes_de_linhas(cabecalho, linhas, tamanho_lote):
+    _verificar_colunas(cabecalho)
+    colunas = COLUNAS_FLUXO + ([COLUNA_ID] if COLUNA_ID in cabecalho else [])
+    posicoes = {col: cabecalho.index(col) for col in colunas}
+    lote = {col: [] for col in colunas}
+    for linha in linhas:
+        for col, pos in posicoes.items():
+            lote[col].append(linha[pos] if pos < len(linha) else None)
+        if len(lote['Status']) >= tamanho_lote:
+            yield lote
+            lote = {col: [] for col in colunas}
+    if lote['Status']:
+        yield lote
+
+
+def ler_lotes(caminho, tamanho_lote=TAMANHO_LOTE):
+    """Gera lotes {coluna: lista de valores} apenas com as COLUNAS_FLUXO (e o ID)."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        return _lotes_csv(caminho, tamanho_lote)
+    if extensao == '.parquet':
+        return _lotes_parquet(caminho, tamanho_lote)
+    return _lotes_excel(caminho, tamanho_lote)
+
+
+def contar_em_fluxo(caminhos, tamanho_lote=TAMANHO_LOTE):
+    """
+    Percorre os arquivos uma vez e devolve os contadores usados pelo relatório:
+    {'Status': Counter, 'Subcategoria': Counter, 'Prioridade': Counter, 'Data_Dia': Counter,
+    'Datas_Invalidas': int}. Os Counters preservam a ordem em que cada valor apareceu
+    pela primeira vez.
+
+    Mesma regra do carregamento completo (dados.remover_repetidos): um 'ID'
+    repetido, no mesmo arquivo ou em outro, conta só pela sua última linha (na
+    ordem dos arquivos). Para isso, os valores da última linha de cada ID ficam
+    guardados até o fim; linhas sem ID contam sempre. Sem a coluna 'ID', nenhuma
+    linha é removida.
+    """
+    if isinstance(caminhos, str):
+        caminhos = [caminhos]
+    contadores = {col: Counter() for col in ['Status', 'Subcategoria', 'Prioridade', 'Data_Dia']}
+    contadores['Datas_Invalidas'] = 0
+    # Linhas que entram na contagem, na ordem em que ficariam no DataFrame:
+    # (Status, Subcategoria, Prioridade, dia em ns ou None, data inválida)
+    ultimas = {}
+    sem_id = 0
+    dias_ns = Counter()
+
+    for caminho in caminhos:
+        for lote in ler_lotes(caminho, tamanho_lote):
+            textos = [[_texto(v) for v in lote[col]] for col in ['Status', 'Subcategoria', 'Prioridade']]
+            # Mesma conversão do carregamento completo (cada valor distinto do lote uma vez)
+            datas, invalidas = converter_datas(pd.Series(lote['Data Abertura'], dtype=object), posicoes=True)
+            dias = datas.dt.normalize()
+
+            if COLUNA_ID not in lote:
+                for col, valores in zip(['Status', 'Subcategoria', 'Prioridade'], textos):
+                    contadores[col].update(t for t in valores if t is not None)
+                contadores['Data_Dia'].update(dias.value_counts().to_dict())
+                contadores['Datas_Invalidas'] += len(invalidas)
+                continue
+
+            invalida = np.zeros(len(dias), dtype=bool)
+            invalida[invalidas] = True
+            # No tolist cada dia vira um escalar leve (inteiro em ns) e o NaT vira None
+            for linha in zip(lote[COLUNA_ID], *textos, dias.to_numpy().tolist(), invalida.tolist()):
+                id_ = linha[0]
+                if pd.isna(id_) or id_ == '':
+                    chave, sem_id = ('sem ID', sem_id), sem_id + 1
+                else:
+                    # A versão nova vai para o fim: a ordem passa a ser a da última linha
+                    chave = id_
+                    ultimas.pop(chave, None)
+                ultimas[chave] = linha[1:]
+
+    for status, subcategoria, prioridade, dia, invalida in ultimas.values():
+        for col, valor in [('Status', status), ('Subcategoria', subcategoria), ('Prioridade', prioridade)]:
+            if valor is not None:
+                contadores[col][valor] += 1
+        if dia is not None:
+            dias_ns[dia] += 1
+        contadores['Datas_Invalidas'] += invalida
+    contadores['Data_Dia'].update({pd.Timestamp(dia): qtd for dia, qtd in dias_ns.items()})
+
+    return contadores
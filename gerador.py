@@ -0,0 +1,146 @@
+"""
+Gerador de exportações sintéticas de chamados, no mesmo formato da planilha do sistema.
+
+Produz de 10 mil a 10 milhões de linhas com as colunas usadas pelo relatório
+(Status, Prioridade, Categoria, Subcategoria, PDV, Assunto, as três datas, Log...),
+com distribuições assimétricas (poucos PDVs e assuntos concentram a maior parte
+dos chamados), assuntos quase repetidos e valores ruins como na exportação real:
+'-' nas datas vazias, números de série do Excel no meio dos textos e colunas mistas.
+
+Uso: python gerador.py [linhas] [saida.xlsx|.csv|.parquet] [semente]
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# O Excel aceita 1.048.576 linhas por planilha (uma é o cabeçalho)
+LIMITE_LINHAS_EXCEL = 1_048_575
+
+STATUS = {'Finalizado': 0.80, 'Andamento': 0.15, 'Aberto': 0.05}
+PRIORIDADES = {'Média': 0.84, 'Baixa': 0.08, 'Alta': 0.04, 'Indefinida': 0.03, 'Crítica': 0.01}
+CATEGORIAS = {'TI': 0.90, 'Manutenção': 0.06, 'Marketing': 0.04}
+SUBCATEGORIAS = ['APP Borelli', 'Sistema Borelli', 'Minha Borelli', 'Essenza', 'Impressora',
+                 'Rede/Internet', 'Maquininha', 'E-mail', 'Totem', 'Balança', 'Câmeras', 'Telefonia']
+CIDADES = ['RIB PRETO', 'SAO PAULO', 'CAMPINAS', 'CURITIBA', 'BAURU', 'SERTAOZINHO', 'GOIANIA',
+           'BRASILIA', 'ANAPOLIS', 'ARACATUBA', 'BARRETOS', 'ATIBAIA', 'SANTOS', 'SOROCABA',
+           'LONDRINA', 'MARINGA', 'UBERLANDIA', 'FRANCA', 'JUNDIAI', 'PIRACICABA']
+LOCAIS = ['RUA', 'SHOPPING', 'RUA - CENTRO', 'SHOPPING - IGUATEMI', 'RUA - JARDINS', 'QUIOSQUE']
+ASSUNTOS = ['Cupom de aniversário indisponível', 'Erro ao finalizar venda no PDV', 'Impressora fiscal não imprime',
+            'Internet caiu na loja', 'App não carrega o cardápio', 'Maquininha recusando cartão',
+            'Sistema lento no fechamento de caixa', 'Não consigo acessar o e-mail', 'Totem travado na tela inicial',
+            'Balança não comunica com o sistema', 'Câmera sem imagem', 'Telefone sem linha',
+            'Pontos do cliente não aparecem no app', 'Erro de sincronização de estoque',
+            'Nota fiscal rejeitada pela SEFAZ', 'Senha do sistema expirada', 'Produto sem preço cadastrado',
+            'Relatório de vendas não abre', 'Pedido do iFood não entra no sistema', 'Atualização do app falhou']
+VARIACOES = ['', '', '', ' urgente', ' novamente', ' - loja parada', '!!', ' hoje', ' desde ontem', ' (reincidente)']
+NOMES = ['Brian Cardoso', 'Ana Souza', 'Carlos Lima', 'Juliana Alves', 'Pedro Rocha', 'Mariana Costa',
+         'Lucas Pereira', 'Fernanda Dias', 'Rafael Gomes', 'Camila Martins']
+ATENDENTES = ['Silmara Lino Barreto', 'Ricardo Silva', 'Camila Gatti', 'Bruna Pedreschi Chaves']
+
+
+def _escolher(rng, opcoes, linhas):
+    """Sorteio com os pesos do dicionário {valor: probabilidade}."""
+    valores = np.array(list(opcoes), dtype=object)
+    return valores[rng.choice(len(valores), linhas, p=np.array(list(opcoes.values())))]
+
+
+def _zipf(rng, valores, linhas, expoente=1.2):
+    """Sorteio com cauda longa: o primeiro valor é o mais frequente."""
+    pesos = 1 / np.arange(1, len(valores) + 1) ** expoente
+    return np.asarray(valores, dtype=object)[rng.choice(len(valores), linhas, p=pesos / pesos.sum())]
+
+
+def _formatar(minutos, origem):
+    """Minutos desde a origem -> 'dd/mm/aaaa hh:mm', formatando cada minuto distinto uma vez."""
+    distintos, posicoes = np.unique(minutos, return_inverse=True)
+    textos = (origem + pd.to_timedelta(distintos, unit='min')).strftime('%d/%m/%Y %H:%M').to_numpy(dtype=object)
+    return textos[posicoes]
+
+
+def gerar_chamados(linhas, semente=42, inicio='2024-01-01', dias=730, taxa_ruins=0.002):
+    """
+    DataFrame com 'linhas' chamados no formato bruto da exportação (datas como
+    texto, '-' quando vazias). 'taxa_ruins' é a fração de datas de abertura
+    trocadas por valores problemáticos (série do Excel, texto inválido).
+    """
+    rng = np.random.default_rng(semente)
+    origem = pd.Timestamp(inicio)
+
+    pdvs = [f"{cidade} - {local}" for cidade in CIDADES for local in LOCAIS]
+    rng.shuffle(pdvs)
+    assuntos = [f"{assunto}{variacao}" for assunto in ASSUNTOS for variacao in dict.fromkeys(VARIACOES)]
+
+    status = _escolher(rng, STATUS, linhas)
+    finalizado = status == 'Finalizado'
+    aberto = status == 'Aberto'
+
+    # Abertura: mais chamados em dias úteis e em horário comercial
+    dia = rng.integers(0, dias, linhas)
+    fim_de_semana = ((origem.dayofweek + dia) % 7) >= 5
+    dia = np.where(fim_de_semana & (rng.random(linhas) < 0.6), dia - 2, dia).clip(0, dias - 1)
+    hora = np.clip(rng.normal(13, 3.5, linhas), 0, 23.98)
+    abertura = dia * 1440 + (hora * 60).astype(np.int64)
+
+    # Primeira resposta em horas (mediana ~8h) e solução (mediana ~200h), cauda longa
+    resposta = abertura + (rng.lognormal(np.log(8), 1.0, linhas) * 60).astype(np.int64)
+    solucao = np.maximum(resposta, abertura + (rng.lognormal(np.log(200), 0.9, linhas) * 60).astype(np.int64))
+
+    data_abertura = _formatar(abertura, origem)
+    primeiro_retorno = np.where(aberto, '-', _formatar(resposta, origem))
+    data_finalizado = np.where(finalizado, _formatar(solucao, origem), '-')
+
+    # Valores ruins: número de série do Excel ou texto que não é data
+    ruins = np.flatnonzero(rng.random(linhas) < taxa_ruins)
+    serie_excel = (origem - pd.Timestamp('1899-12-30')).days + abertura[ruins] / 1440
+    data_abertura[ruins] = np.where(rng.random(len(ruins)) < 0.5, np.round(serie_excel, 5).astype(object), '00/00/0000')
+
+    solicitante = _zipf(rng, NOMES, linhas, 0.8)
+    atendente = rng.choice(np.array(ATENDENTES, dtype=object), linhas)
+    log = ("Status: Aberto, Data: " + data_abertura.astype(str) + ", Nome: " + solicitante.astype(str))
+    log = np.where(aberto, log, log + "\nStatus: " + status.astype(str) + ", Data: "
+                   + primeiro_retorno.astype(str) + ", Nome: " + atendente.astype(str))
+
+    # Coluna mista como na exportação real: '-' ou um número
+    quantidade = np.where(rng.random(linhas) < 0.9, '-', rng.integers(1, 20, linhas).astype(object))
+
+    return pd.DataFrame({
+        'ID': np.arange(1, linhas + 1),
+        'Status': status,
+        'Indevido': np.where(rng.random(linhas) < 0.02, 'Sim', 'Não'),
+        'Data Abertura': data_abertura,
+        'Data Finalizado': data_finalizado,
+        'Tipo do Chamado': 'Interno',
+        'Prioridade': _escolher(rng, PRIORIDADES, linhas),
+        'Categoria': _escolher(rng, CATEGORIAS, linhas),
+        'Subcategoria': _zipf(rng, SUBCATEGORIAS, linhas),
+        'Quantidade': quantidade,
+        'PDV': _zipf(rng, pdvs, linhas, 1.0),
+        'Nome Solicitante': solicitante,
+        'Assunto': _zipf(rng, assuntos, linhas, 1.1),
+        'Primeiro Retorno': primeiro_retorno,
+        'Log': log,
+    })
+
+
+def salvar(df, caminho):
+    """Grava no formato da extensão (.xlsx até o limite do Excel, .csv ou .parquet)."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == '.csv':
+        df.to_csv(caminho, index=False)
+    elif extensao == '.parquet':
+        # Colunas mistas viram texto (o Parquet exige um tipo por coluna)
+        df.astype({col: str for col in df.columns[df.dtypes == object]}).to_parquet(caminho, index=False)
+    else:
+        if len(df) > LIMITE_LINHAS_EXCEL:
+            raise ValueError(f"O Excel aceita até {LIMITE_LINHAS_EXCEL:,} linhas; use .csv ou .parquet.")
+        df.to_excel(caminho, index=False)
+
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    saida = sys.argv[2] if len(sys.argv) > 2 else f"chamados_sinteticos_{linhas}.xlsx"
+    semente = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    salvar(gerar_chamados(linhas, semente), saida)
+    print(f"{linhas:,} chamados gravados em '{saida}'.")
@@ -0,0 +1,204 @@
+"""
+Detecção de incidentes recorrentes: chamados com 'Assunto' quase igual.
+
+Cada assunto distinto vira um conjunto de shingles (trechos de k caracteres) e
+uma assinatura MinHash, calculada uma vez por planilha. Para agrupar, as
+assinaturas dos assuntos presentes na seleção são divididas em bandas (LSH):
+só assuntos que caem no mesmo balde em alguma banda são comparados, o que evita
+comparar todos os pares.
+
+Uso em lote: python incidentes.py chamados.xlsx
+"""
+import re
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+PRIMO = (1 << 31) - 1  # primo de Mersenne: a*x + b cabe em uint64 sem estourar
+N_HASHES = 64
+TAMANHO_SHINGLE = 4
+# Intervalo sem chamados que encerra um incidente: depois dele, o mesmo assunto é outro incidente
+INTERVALO_MAXIMO = pd.Timedelta(hours=24)
+# Janela máxima de um incidente: um problema que não para é contado semana a semana
+DURACAO_MAXIMA = pd.Timedelta(days=7)
+# PDVs listados por incidente (os de mais chamados); os demais aparecem como "+k"
+PDVS_LISTADOS = 5
+
+
+def normalizar(texto):
+    """Minúsculas, sem pontuação e com espaços simples."""
+    texto = re.sub(r'[^\w\s]', ' ', str(texto).lower())
+    return ' '.join(texto.split())
+
+
+def shingles(texto, k=TAMANHO_SHINGLE):
+    """Hashes dos trechos de k caracteres do texto normalizado."""
+    texto = normalizar(texto)
+    if len(texto) <= k:
+        trechos = {texto}
+    else:
+        trechos = {texto[i:i + k] for i in range(len(texto) - k + 1)}
+    return np.array([zlib.crc32(t.encode('utf-8')) % PRIMO for t in trechos], dtype=np.uint64)
+
+
+def calcular_assinaturas(serie, n_hashes=N_HASHES, semente=7):
+    """
+    Assinatura MinHash de cada assunto distinto da coluna, além do código do
+    assunto de cada chamado (-1 quando vazio).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        assuntos = serie.cat.categories
+    else:
+        codigos, assuntos = pd.factorize(serie)
+
+    rng = np.random.default_rng(semente)
+    a = rng.integers(1, PRIMO, n_hashes, dtype=np.uint64)
+    b = rng.integers(0, PRIMO, n_hashes, dtype=np.uint64)
+
+    # Todos os shingles em um vetor só; 'inicios' marca onde começa cada assunto
+    hashes = [shingles(assunto) for assunto in assuntos]
+    inicios = np.r_[0, np.cumsum([len(h) for h in hashes])[:-1]].astype(np.int64)
+    todos = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+
+    assinaturas = np.empty((len(assuntos), n_hashes), dtype=np.uint32)
+    for i in range(n_hashes):
+        # Cada coluna é uma permutação (a*x + b) mod p; o mínimo por assunto sai do reduceat
+        if len(todos):
+            assinaturas[:, i] = np.minimum.reduceat((a[i] * todos + b[i]) % PRIMO, inicios)
+
+    return {'assinaturas': assinaturas, 'codigos': np.asarray(codigos, dtype=np.int32)}
+
+
+def _componentes(n, origem, destino):
+    """Componentes conexos por propagação do menor rótulo (vetorizado)."""
+    rotulos = np.arange(n)
+    while True:
+        novos = rotulos.copy()
+        np.minimum.at(novos, origem, rotulos[destino])
+        np.minimum.at(novos, destino, rotulos[origem])
+        novos = novos[novos]  # salta direto para o rótulo do rótulo
+        if np.array_equal(novos, rotulos):
+            return rotulos
+        rotulos = novos
+
+
+def agrupar_assuntos(assinaturas, codigos_assunto, bandas=16, limiar=0.5):
+    """
+    Agrupa os assuntos informados via LSH. Devolve, na mesma ordem dos códigos,
+    o rótulo do grupo (código do assunto representante).
+    """
+    sub = assinaturas[codigos_assunto]
+    n, n_hashes = sub.shape
+    linhas_banda = n_hashes // bandas
+    origem, destino = [], []
+
+    for banda in range(bandas):
+        trecho = np.ascontiguousarray(sub[:, banda * linhas_banda:(banda + 1) * linhas_banda])
+        # Cada banda vira uma chave de bytes; assuntos com a mesma chave caem no mesmo balde
+        chaves = trecho.view(np.dtype((np.void, trecho.dtype.itemsize * linhas_banda))).ravel()
+        _, baldes = np.unique(chaves, return_inverse=True)
+        ordem = np.argsort(baldes, kind='stable')
+        inicio_balde = np.r_[True, baldes[ordem][1:] != baldes[ordem][:-1]]
+        primeiro = ordem[np.maximum.accumulate(np.where(inicio_balde, np.arange(n), 0))]
+
+        # Confirma cada candidato pela similaridade estimada com o primeiro do balde
+        candidatos = np.flatnonzero(primeiro != ordem)
+        if len(candidatos) == 0:
+            continue
+        membros, representantes = ordem[candidatos], primeiro[candidatos]
+        similaridade = (sub[membros] == sub[representantes]).mean(axis=1)
+        origem.append(membros[similaridade >= limiar])
+        destino.append(representantes[similaridade >= limiar])
+
+    if origem:
+        grupos = _componentes(n, np.concatenate(origem), np.concatenate(destino))
+    else:
+        grupos = np.arange(n)
+    return codigos_assunto[grupos]
+
+
+def _listar_pdvs(pdvs, limite=PDVS_LISTADOS):
+    """Os PDVs com mais chamados no incidente e, se houver mais, quantos ficaram de fora."""
+    contagem = pdvs.value_counts()
+    nomes = ', '.join(map(str, contagem.index[:limite]))
+    return nomes if len(contagem) <= limite else f"{nomes} +{len(contagem) - limite}"
+
+
+def detectar_incidentes(df, assinaturas=None, linhas=None, limiar=0.5, minimo_chamados=3,
+                        intervalo_maximo=INTERVALO_MAXIMO, duracao_maxima=DURACAO_MAXIMA):
+    """
+    Agrupa os chamados selecionados (posições em 'linhas'; None = todos) em
+    incidentes e devolve um resumo por grupo: tamanho, janela de tempo e PDVs.
+    Assuntos parecidos separados por mais de 'intervalo_maximo' sem chamados
+    viram incidentes diferentes, e nenhum incidente passa de 'duracao_maxima'.
+    """
+    if 'Assunto' not in df.columns:
+        return pd.DataFrame()
+    if assinaturas is None:
+        assinaturas = calcular_assinaturas(df['Assunto'])
+    if linhas is None:
+        linhas = np.arange(len(df))
+
+    codigos = assinaturas['codigos'][linhas]
+    validos = codigos >= 0
+    linhas, codigos = linhas[validos], codigos[validos]
+    if len(linhas) == 0:
+        return pd.DataFrame()
+
+    presentes = np.unique(codigos)
+    mapa = np.zeros(assinaturas['assinaturas'].shape[0], dtype=np.int64)
+    mapa[presentes] = agrupar_assuntos(assinaturas['assinaturas'], presentes, limiar=limiar)
+
+    selecao = pd.DataFrame({'Grupo': mapa[codigos], 'Assunto': df['Assunto'].to_numpy()[linhas]})
+    for col in ['Data Abertura', 'PDV']:
+        if col in df.columns:
+            selecao[col] = df[col].to_numpy()[linhas]
+
+    # Cada grupo de assuntos é cortado nas pausas maiores que intervalo_maximo e,
+    # dentro de cada trecho, em janelas de duracao_maxima a partir do primeiro
+    # chamado; os chamados sem data válida ficam juntos, no fim do grupo
+    if 'Data Abertura' in selecao.columns:
+        selecao = selecao.sort_values(['Grupo', 'Data Abertura'], na_position='last', kind='stable')
+        datas = selecao['Data Abertura']
+        novo = ((selecao['Grupo'] != selecao['Grupo'].shift()) | (datas.diff() > intervalo_maximo)
+                | (datas.isna() & datas.shift().notna()))
+        trecho = novo.cumsum()
+        janela = ((datas - datas.groupby(trecho).transform('min')) // duracao_maxima).fillna(0)
+        selecao['Incidente'] = selecao.groupby([trecho, janela], sort=False).ngroup()
+    else:
+        selecao['Incidente'] = selecao['Grupo']
+
+    tamanho = selecao.groupby('Incidente').size()
+    grandes = tamanho.index[tamanho >= minimo_chamados]
+    selecao = selecao[selecao['Incidente'].isin(grandes)]
+    if selecao.empty:
+        return pd.DataFrame()
+
+    agrupado = selecao.groupby('Incidente')
+    resumo = pd.DataFrame({
+        'Chamados': agrupado.size(),
+        'Assunto Principal': agrupado['Assunto'].agg(lambda s: s.value_counts().index[0]),
+        'Variações de Texto': agrupado['Assunto'].nunique(),
+    })
+    if 'Data Abertura' in selecao.columns:
+        resumo['Início'] = agrupado['Data Abertura'].min()
+        resumo['Fim'] = agrupado['Data Abertura'].max()
+    if 'PDV' in selecao.columns:
+        resumo['PDVs Afetados'] = agrupado['PDV'].nunique()
+        resumo['PDVs'] = agrupado['PDV'].agg(_listar_pdvs)
+
+    return resumo.sort_values('Chamados', ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from dados import carregar_chamados
+
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else "chamados.xlsx"
+    incidentes = detectar_incidentes(carregar_chamados(arquivo))
+    if incidentes.empty:
+        print("Nenhum incidente recorrente encontrado.")
+    else:
+        print(incidentes.to_string())
@@ -1,71 +1,131 @@
-import pandas as pd
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 import seaborn as sns
 
+from armazem import atualizar_armazem, ler_armazem
+from config import LOG_DESEMPENHO, MOTOR
+from dados import carregar_varios, listar_planilhas
+from esquema import ORDEM_PRIORIDADE
+from fluxo import contar_em_fluxo
+from medicao import Medidor, configurar_log, encerrar_perfil, iniciar_perfil
+from motor import MOTORES, contar_por_dia, contar_valores, resolver_motor, tabela_consulta
+from quantis import ALFA, construir_esbocos, quantis
+from serie_temporal import escolher_granularidade, preparar_serie
+
 # ---------------------------------------------------------
 # CONFIGURAÇÃO
 # ---------------------------------------------------------
-# Coloque o nome exato do seu arquivo aqui (certifique-se de que é .xlsx)
-nome_do_arquivo = "chamados.xlsx" 
-
-try:
-    # ---------------------------------------------------------
-    # 1. CARREGAMENTO DOS DADOS (MODO REAL)
-    # ---------------------------------------------------------
-    print(f"Lendo o arquivo: {nome_do_arquivo}...")
-    df = pd.read_excel(nome_do_arquivo)
-    
-    # Limpeza preventiva dos nomes das colunas (remove espaços extras antes/depois)
-    # Ex: Transforma " Status " em "Status"
-    df.columns = df.columns.str.strip()
-
-    # Verifica se as colunas essenciais existem
-    colunas_necessarias = ['Status', 'Data Abertura', 'Subcategoria', 'Prioridade']
-    for col in colunas_necessarias:
-        if col not in df.columns:
-            raise ValueError(f"A coluna '{col}' não foi encontrada no Excel. Verifique se o nome está exato.")
-
-    # ---------------------------------------------------------
-    # 2. LIMPEZA E TRATAMENTO DE DADOS
-    # ---------------------------------------------------------
-    
-    # Converter 'Data Abertura' para data (trata erros como '-' transformando em NaT)
-    # dayfirst=True força a leitura como Dia/Mês/Ano (padrão Brasil)
-    df['Data Abertura'] = pd.to_datetime(df['Data Abertura'], dayfirst=True, errors='coerce')
-    
-    # Criar coluna apenas com a Data (para o gráfico de linha)
-    df['Data_Dia'] = df['Data Abertura'].dt.date
-
-    # Limpar espaços em branco nos textos das colunas categóricas
-    cols_texto = ['Status', 'Subcategoria', 'Prioridade']
-    for col in cols_texto:
-        # Converte para string e remove espaços
-        df[col] = df[col].astype(str).str.strip()
-
-    # ---------------------------------------------------------
-    # 3. CRIAÇÃO DO VISUAL (DASHBOARD)
-    # ---------------------------------------------------------
-    print("Gerando gráficos...")
-    
+# Coloque o nome exato do seu arquivo aqui (certifique-se de que é .xlsx).
+# Na linha de comando é possível passar vários arquivos ou uma pasta inteira.
+nome_do_arquivo = "chamados.xlsx"
+
+# Modo fluxo: lê a planilha linha a linha e só guarda contadores.
+# Use para exportações muito grandes (também pode ser ligado com --fluxo)
+modo_fluxo = False
+
+# Modo armazém: acumula as exportações diárias em um armazém local e só trata
+# os chamados novos ou alterados (também pode ser ligado com --armazem)
+modo_armazem = False
+
+# Imprime a tabela de percentis (p50/p90/p95/p99) do tempo de solução por
+# Prioridade e Subcategoria (também pode ser ligado com --percentis)
+mostrar_percentis = False
+
+# Relatórios em lote: um dashboard por valor da coluna (ex.: "PDV" ou "Categoria"),
+# gerados sem janela, em paralelo, na pasta de saída (também com --por COLUNA)
+agrupar_por = None
+pasta_saida = "relatorios"
+
+# Resolução e formato das imagens geradas (png, svg ou pdf)
+dpi_imagem = 300
+formato_imagem = "png"
+
+# Imprime, ao final, o tempo, a CPU, o pico de memória e as linhas de cada etapa
+# (também pode ser ligado com --desempenho; o log JSON fica em --log-desempenho)
+medir_desempenho = False
+
+
+def ordenar_contagem(contagem):
+    """Maior contagem primeiro; empates em ordem alfabética (igual nos dois modos)."""
+    contagem = contagem[contagem > 0]
+    ordem = np.lexsort((contagem.index.to_numpy(dtype=str), -contagem.to_numpy()))
+    return contagem.iloc[ordem]
+
+
+def contagens_em_memoria(df, linhas=None, motor=None, tabela=None):
+    """
+    Contadores do relatório a partir do DataFrame já tratado (só as 'linhas', se
+    informadas). 'tabela' é a do motor.tabela_consulta(df), para quem conta várias vezes.
+    """
+    # Motor Arrow: as colunas contadas são convertidas uma vez para todas as contagens
+    if tabela is None and resolver_motor(motor) == 'arrow':
+        tabela = tabela_consulta(df)
+    contagens = {}
+    for col in ['Status', 'Subcategoria']:
+        contagens[col] = ordenar_contagem(contar_valores(df, col, linhas, motor, tabela))
+
+    # Prioridades na ordem em que aparecem (define a posição das fora do padrão)
+    contagens['Prioridade'] = contar_valores(df, 'Prioridade', linhas, motor, tabela)
+
+    contagens['Data_Dia'] = contar_por_dia(df, linhas, motor, tabela)
+    contagens['Datas_Invalidas'] = df.attrs.get('datas_invalidas', {}).get('Data Abertura', 0)
+    return contagens
+
+
+def contagens_em_fluxo(caminhos):
+    """Mesmos contadores de contagens_em_memoria, lendo os arquivos em lotes."""
+    contadores = contar_em_fluxo(caminhos)
+    contagens = {col: ordenar_contagem(pd.Series(contadores[col], dtype='int64'))
+                 for col in ['Status', 'Subcategoria']}
+    contagens['Prioridade'] = pd.Series(contadores['Prioridade'], dtype='int64')
+
+    por_dia = pd.Series(contadores['Data_Dia'], dtype='int64').sort_index()
+    por_dia.index = pd.DatetimeIndex(por_dia.index, name='Data_Dia')
+    contagens['Data_Dia'] = por_dia
+    contagens['Datas_Invalidas'] = contadores['Datas_Invalidas']
+    return contagens
+
+
+def tabelas_percentis(df):
+    """Percentis do tempo de solução dos chamados finalizados, por Prioridade e por Subcategoria."""
+    esbocos = construir_esbocos(df)
+    if 'Solucao' not in esbocos:
+        return {}
+    finalizados = esbocos['Solucao'][esbocos['Solucao']['Status'] == 'Finalizado']
+    return {dimensao: quantis(finalizados, grupo=dimensao)
+            for dimensao in ['Prioridade', 'Subcategoria'] if dimensao in finalizados.columns}
+
+
+def desenhar_relatorio(contagens, titulo):
+    """Monta o dashboard 2x2 a partir dos contadores."""
     # Definir estilo visual
     sns.set_theme(style="whitegrid")
     plt.rcParams['font.family'] = 'sans-serif'
 
     # Criar figura 2x2
     fig, axes = plt.subplots(2, 2, figsize=(18, 12))
-    fig.suptitle(f'Relatório de Chamados T.I. - {nome_do_arquivo}', fontsize=20, fontweight='bold', y=0.96)
+    fig.suptitle(f'Relatório de Chamados T.I. - {titulo}', fontsize=20, fontweight='bold', y=0.96)
 
     # --- GRÁFICO 1: Status (Pizza/Rosca) ---
-    status_counts = df['Status'].value_counts()
+    status_counts = contagens['Status']
     # Pega cores suficientes para a quantidade de status
     colors = sns.color_palette('pastel')[0:len(status_counts)]
-    
+
     axes[0, 0].pie(status_counts, labels=status_counts.index, autopct='%1.1f%%', startangle=140, colors=colors, wedgeprops=dict(width=0.4))
     axes[0, 0].set_title('Distribuição por Status', fontsize=14, fontweight='bold')
 
     # --- GRÁFICO 2: Top 10 Subcategorias (Barras Horizontais) ---
     # Aumentei para Top 10 para dar mais detalhe se tiver muitos tipos
-    top_problems = df['Subcategoria'].value_counts().head(10)
+    top_problems = contagens['Subcategoria'].head(10)
     sns.barplot(x=top_problems.values, y=top_problems.index, ax=axes[0, 1], palette="viridis", hue=top_problems.index, legend=False)
     axes[0, 1].set_title('Top 10 Assuntos/Subcategorias', fontsize=14, fontweight='bold')
     axes[0, 1].set_xlabel('Quantidade de Chamados')
@@ -73,24 +133,31 @@ try:
 
     # --- GRÁFICO 3: Prioridade ---
     # Define a ordem lógica das prioridades
-    ordem_prioridade = ['Baixa', 'Média', 'Alta', 'Crítica']
+    ordem_prioridade = ORDEM_PRIORIDADE
     # Filtra apenas as prioridades que existem nos dados atuais para não dar erro
-    ordem_existente = [p for p in ordem_prioridade if p in df['Prioridade'].unique()]
+    contagem_prioridade = contagens['Prioridade']
+    ordem_existente = [p for p in ordem_prioridade if p in contagem_prioridade.index]
     # Se houver prioridades fora do padrão, adiciona elas ao final
-    outras = [p for p in df['Prioridade'].unique() if p not in ordem_prioridade]
+    outras = [p for p in contagem_prioridade.index if p not in ordem_prioridade]
     ordem_final = ordem_existente + outras
+    volume_prioridade = contagem_prioridade.reindex(ordem_final)
 
-    sns.countplot(x='Prioridade', data=df, ax=axes[1, 0], palette="magma", order=ordem_final, hue='Prioridade', legend=False)
+    sns.barplot(x=volume_prioridade.index, y=volume_prioridade.values, ax=axes[1, 0], palette="magma", order=ordem_final, hue=volume_prioridade.index, legend=False)
     axes[1, 0].set_title('Volume por Prioridade', fontsize=14, fontweight='bold')
     axes[1, 0].set_xlabel('')
     axes[1, 0].set_ylabel('Quantidade')
 
-    # --- GRÁFICO 4: Evolução Diária (Linha) ---
-    chamados_por_dia = df.groupby('Data_Dia').size()
-    
+    # --- GRÁFICO 4: Evolução no Tempo (Linha) ---
+    # Por dia, semana ou mês conforme o período coberto; muitos pontos são reduzidos com LTTB
+    chamados_por_dia = contagens['Data_Dia']
+    chamados_por_dia = chamados_por_dia[chamados_por_dia.index.notna()]
+
     if not chamados_por_dia.empty:
-        chamados_por_dia.plot(kind='line', marker='o', ax=axes[1, 1], color='#2980b9', linewidth=2)
-        axes[1, 1].set_title('Volume de Abertura (Dia a Dia)', fontsize=14, fontweight='bold')
+        regra = escolher_granularidade(chamados_por_dia.index.min(), chamados_por_dia.index.max(), minima='D')
+        serie = preparar_serie(chamados_por_dia, regra).set_index('Data')['Qtd']
+        serie.plot(kind='line', marker='o' if len(serie) <= 120 else None, ax=axes[1, 1], color='#2980b9', linewidth=2)
+        titulo_evolucao = {'D': 'Dia a Dia', 'W-MON': 'Semana a Semana', 'MS': 'Mês a Mês'}[regra]
+        axes[1, 1].set_title(f'Volume de Abertura ({titulo_evolucao})', fontsize=14, fontweight='bold')
         axes[1, 1].set_xlabel('Data')
         axes[1, 1].grid(True, linestyle='--', alpha=0.7)
     else:
@@ -98,16 +165,220 @@ try:
 
     # Ajuste fino do layout
     plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    return fig
+
+
+def nome_seguro(valor):
+    """Nome de arquivo a partir do valor do grupo (sem barras, acentos mantidos)."""
+    return re.sub(r'[^\w\-]+', '_', str(valor)).strip('_') or 'vazio'
+
+
+def _renderizar_grupo(tarefa):
+    # Executado em um processo separado: desenha e salva um relatório, sem janela
+    grupo, chamados, contagens, titulo, caminho, dpi, formato = tarefa
+    plt.switch_backend('Agg')
+    inicio = time.perf_counter()
+    fig = desenhar_relatorio(contagens, titulo)
+    fig.savefig(caminho, dpi=dpi, format=formato)
+    plt.close(fig)
+    return {'grupo': grupo, 'arquivo': caminho, 'chamados': chamados,
+            'segundos': round(time.perf_counter() - inicio, 3)}
+
+
+def gerar_relatorios_por_grupo(df, coluna, titulo, pasta, dpi=300, formato="png", processos=None, motor=None):
+    """
+    Um dashboard por valor de 'coluna', renderizado em paralelo (um processo por
+    núcleo). As contagens de cada grupo são feitas aqui, uma vez; os processos só
+    desenham. Grava 'manifesto.json' na pasta com o tempo de cada relatório.
+    """
+    if coluna not in df.columns:
+        raise ValueError(f"A coluna '{coluna}' não foi encontrada no Excel. Verifique se o nome está exato.")
+    os.makedirs(pasta, exist_ok=True)
+    inicio = time.perf_counter()
+
+    # Motor Arrow: a tabela é convertida uma vez e cada grupo só pega as suas linhas
+    tabela = tabela_consulta(df) if resolver_motor(motor) == 'arrow' else None
+    tarefas, usados = [], set()
+    for grupo, linhas in df.groupby(coluna, observed=True).indices.items():
+        nome = nome_seguro(grupo)
+        if nome.lower() in usados:  # grupos que só diferem em pontuação/maiúsculas
+            nome = f"{nome}_{len(usados)}"
+        usados.add(nome.lower())
+        caminho = os.path.join(pasta, f"{nome}.{formato}")
+        contagens = contagens_em_memoria(df, linhas, motor, tabela)
+        tarefas.append((str(grupo), len(linhas), contagens, f"{titulo} - {coluna}: {grupo}", caminho, dpi, formato))
+
+    processos = processos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(processos, max(len(tarefas), 1))) as executor:
+        relatorios = list(executor.map(_renderizar_grupo, tarefas))
+
+    manifesto = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'origem': titulo,
+        'coluna': coluna,
+        'formato': formato,
+        'dpi': dpi,
+        'total_segundos': round(time.perf_counter() - inicio, 3),
+        'relatorios': relatorios,
+    }
+    caminho_manifesto = os.path.join(pasta, "manifesto.json")
+    with open(caminho_manifesto, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    return manifesto, caminho_manifesto
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera o relatório visual de chamados de T.I.")
+    parser.add_argument("arquivos", nargs="*", default=[nome_do_arquivo],
+                        help="Planilhas (.xlsx), .csv/.parquet (modo fluxo) ou pastas com esses arquivos")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos para ler várias planilhas em paralelo (padrão: nº de núcleos)")
+    parser.add_argument("--fluxo", action="store_true", default=modo_fluxo,
+                        help="Lê linha a linha com memória constante (exportações muito grandes)")
+    parser.add_argument("--percentis", action="store_true", default=mostrar_percentis,
+                        help="Imprime os percentis de SLA por Prioridade e Subcategoria")
+    parser.add_argument("--armazem", action="store_true", default=modo_armazem,
+                        help="Integra as planilhas ao armazém local e gera o relatório do armazém inteiro")
+    parser.add_argument("--por", default=agrupar_por, metavar="COLUNA",
+                        help="Gera um relatório por valor da coluna (ex.: PDV, Categoria), sem abrir janela")
+    parser.add_argument("--saida", default=pasta_saida, help="Pasta dos relatórios gerados com --por")
+    parser.add_argument("--dpi", type=int, default=dpi_imagem, help="Resolução das imagens")
+    parser.add_argument("--formato", choices=["png", "svg", "pdf"], default=formato_imagem,
+                        help="Formato das imagens")
+    parser.add_argument("--sem-janela", action="store_true",
+                        help="Só salva a imagem, sem abrir a janela do matplotlib (servidores, agendamentos)")
+    parser.add_argument("--desempenho", action="store_true", default=medir_desempenho,
+                        help="Mostra tempo, CPU, pico de memória e linhas de cada etapa")
+    parser.add_argument("--log-desempenho", default=LOG_DESEMPENHO, metavar="ARQUIVO",
+                        help="Grava cada etapa como uma linha JSON no arquivo ('-' para o stderr)")
+    parser.add_argument("--motor", choices=MOTORES, default=MOTOR,
+                        help="Motor da limpeza, das contagens e das agregações (padrão: RELATORIO_MOTOR)")
+    parser.add_argument("--perfil", metavar="ARQUIVO", help="Grava o perfil do cProfile da execução (.prof)")
+    args = parser.parse_args()
+    if args.por or args.sem_janela:
+        # Backend sem interface gráfica: nada é exibido, plt.show() nunca é chamado
+        plt.switch_backend('Agg')
+    arquivos = listar_planilhas(args.arquivos, ('.xlsx', '.csv', '.parquet') if args.fluxo else ('.xlsx',))
+    nome_do_arquivo = ", ".join(arquivos) if len(arquivos) <= 3 else f"{len(arquivos)} arquivos"
+
+    # O pico de memória (tracemalloc) só é medido com --desempenho: deixa as alocações mais lentas
+    medidor = Medidor('main', memoria=args.desempenho)
+    configurar_log(args.log_desempenho)
+    perfil = iniciar_perfil() if args.perfil else None
+
+    try:
+        # ---------------------------------------------------------
+        # 1. CARREGAMENTO DOS DADOS (MODO REAL)
+        # ---------------------------------------------------------
+        print(f"Lendo o arquivo: {nome_do_arquivo}...")
+
+        if args.fluxo and args.por:
+            raise ValueError("Os relatórios por grupo (--por) precisam da planilha inteira; não use --fluxo.")
+
+        if args.fluxo:
+            # Só as colunas necessárias (COLUNAS_FLUXO) são lidas, em lotes; a planilha
+            # nunca fica inteira na memória (as colunas são verificadas no cabeçalho)
+            with medidor.etapa("1-2. Leitura em fluxo e contagens") as etapa:
+                contagens = contagens_em_fluxo(arquivos)
+                etapa['linhas'] = contagens['Status'].sum()
+            if args.percentis:
+                print("Aviso: os percentis de SLA não estão disponíveis no modo fluxo.")
+        else:
+            if args.armazem:
+                # Só os chamados novos ou alterados desde a última exportação são tratados;
+                # o relatório cobre tudo o que já foi acumulado no armazém
+                for arquivo in arquivos:
+                    with medidor.etapa(f"1. Armazém: {os.path.basename(arquivo)}"):
+                        resumo = atualizar_armazem(arquivo)
+                    if resumo is None:
+                        print(f"{arquivo}: já integrado ao armazém.")
+                    else:
+                        print(f"{arquivo}: {resumo['novos']} novos, {resumo['alterados']} alterados, "
+                              f"{resumo['inalterados']} sem mudança.")
+                with medidor.etapa("1. Carregamento") as etapa:
+                    df = ler_armazem()
+                    etapa['linhas'] = len(df) if df is not None else None
+                if df is None:
+                    raise ValueError("O armazém local está vazio.")
+                print(f"{len(df)} chamados no armazém.")
+            else:
+                # Usa o mesmo carregamento do dashboard: se a planilha já foi tratada antes
+                # (aqui ou no site), os dados vêm do snapshot colunar em disco
+                # Com vários arquivos, cada um é lido em um processo e os repetidos são removidos
+                with medidor.etapa("1. Carregamento") as etapa:
+                    df, tempos = carregar_varios(arquivos, processos=args.processos, motor=args.motor)
+                    etapa['linhas'] = len(df)
+                if len(arquivos) > 1:
+                    print(tempos.to_string(index=False, float_format="%.2f"))
+                    print(f"{len(df)} chamados únicos.")
+
+            # Verifica se as colunas essenciais existem
+            colunas_necessarias = ['Status', 'Data Abertura', 'Subcategoria', 'Prioridade']
+            for col in colunas_necessarias:
+                if col not in df.columns:
+                    raise ValueError(f"A coluna '{col}' não foi encontrada no Excel. Verifique se o nome está exato.")
+
+            # ---------------------------------------------------------
+            # 2. LIMPEZA E TRATAMENTO DE DADOS
+            # ---------------------------------------------------------
+            # Feita em carregar_chamados (dados.py):
+            # - nomes de colunas sem espaços extras (" Status " -> "Status")
+            # - datas no padrão Brasil (dd/mm/aaaa hh:mm), série do Excel ou ISO; '-' vira NaT
+            # - 'Data_Dia' apenas com a data (datetime64 à meia-noite), para o gráfico de linha
+            # - textos das colunas categóricas sem espaços em branco, guardados como category
+            # As contagens usam os códigos das colunas categóricas
+            with medidor.etapa("2. Contagens", linhas=len(df)):
+                contagens = contagens_em_memoria(df, motor=args.motor)
+
+            if args.percentis:
+                # Mesmos esboços de quantis do dashboard (erro relativo de até ALFA)
+                with medidor.etapa("2. Percentis", linhas=len(df)):
+                    percentis = tabelas_percentis(df)
+                for dimensao, tabela in percentis.items():
+                    print(f"\nTempo de solução (horas) por {dimensao} - erro de até {ALFA:.0%}:")
+                    print(tabela.to_string(float_format="%.1f"))
+                print()
+
+        if contagens['Datas_Invalidas']:
+            print(f"Aviso: {contagens['Datas_Invalidas']} valores de 'Data Abertura' não foram reconhecidos como data.")
+
+        # ---------------------------------------------------------
+        # 3. CRIAÇÃO DO VISUAL (DASHBOARD)
+        # ---------------------------------------------------------
+        if args.por:
+            # Dados carregados uma vez; cada grupo é desenhado em um processo
+            print(f"Gerando relatórios por {args.por} em '{args.saida}'...")
+            with medidor.etapa("3. Relatórios por grupo", linhas=len(df)):
+                manifesto, caminho_manifesto = gerar_relatorios_por_grupo(
+                    df, args.por, nome_do_arquivo, args.saida, args.dpi, args.formato, args.processos, args.motor)
+            print(f"Sucesso! {len(manifesto['relatorios'])} relatórios gerados em "
+                  f"{manifesto['total_segundos']:.1f}s (detalhes em '{caminho_manifesto}').")
+        else:
+            print("Gerando gráficos...")
+            with medidor.etapa("3. Criação do visual"):
+                desenhar_relatorio(contagens, nome_do_arquivo)
+
+                # Salvar a imagem final
+                nome_imagem = f"Relatorio_TI_Visual.{args.formato}"
+                plt.savefig(nome_imagem, dpi=args.dpi, format=args.formato)
+
+            if args.sem_janela:
+                print(f"Sucesso! Relatório salvo como '{nome_imagem}'.")
+            else:
+                print(f"Sucesso! Relatório salvo como '{nome_imagem}' e exibido na tela.")
+                # Fora da medição: a janela fica aberta até ser fechada
+                plt.show()
+
+    except FileNotFoundError:
+        print(f"ERRO: O arquivo '{nome_do_arquivo}' não foi encontrado.")
+        print("Verifique se o nome está correto e se ele está na mesma pasta do script.")
+    except Exception as e:
+        print(f"Ocorreu um erro inesperado: {e}")
 
-    # Salvar a imagem final
-    nome_imagem = "Relatorio_TI_Visual.png"
-    plt.savefig(nome_imagem, dpi=300)
-    print(f"Sucesso! Relatório salvo como '{nome_imagem}' e exibido na tela.")
-    
-    plt.show()
-
-except FileNotFoundError:
-    print(f"ERRO: O arquivo '{nome_do_arquivo}' não foi encontrado.")
-    print("Verifique se o nome está correto e se ele está na mesma pasta do script.")
-except Exception as e:
-    print(f"Ocorreu um erro inesperado: {e}")
\ No newline at end of file
+    if args.desempenho:
+        print("\nDesempenho por etapa:")
+        print(medidor.tabela().to_string(index=False, na_rep="-"))
+    medidor.encerrar()
+    if perfil is not None:
+        print(f"\nPerfil gravado em '{args.perfil}' (abra com: python -m pstats {args.perfil}).")
+        print(encerrar_perfil(perfil, args.perfil, funcoes=15))
@@ -0,0 +1,191 @@
+"""
+Medição de desempenho por etapa: tempo de relógio, tempo de CPU, pico de memória e linhas.
+
+Cada etapa é um bloco `with medidor.etapa("nome"):` e as etapas podem ser
+aninhadas. O tempo de CPU é o do processo atual (processos filhos da leitura em
+paralelo não entram) e o pico de memória vem do tracemalloc, ligado só quando
+pedido porque deixa as alocações mais lentas. O tracemalloc é um só para o
+processo: fica ligado enquanto algum Medidor pedir memória, e o pico de uma etapa
+inclui o que outras sessões do site alocaram ao mesmo tempo. Os registros alimentam o painel do
+dashboard, a tabela do main.py e, se configurado, um log com uma linha JSON por
+etapa. Para olhar dentro de uma etapa, iniciar_perfil/encerrar_perfil gravam um
+perfil do cProfile.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import time
+import threading
+import tracemalloc
+import uuid
+import weakref
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger("relatorio.desempenho")
+
+# Medidores que pediram memória: o tracemalloc é ligado pelo primeiro e desligado
+# quando o último termina, se foi ligado aqui (e não por quem importou o módulo)
+_trava_memoria = threading.Lock()
+_usuarios_memoria = 0
+_memoria_ligada_aqui = False
+# Medidores com etapas abertas medindo memória (uma sessão do site cada)
+_medindo = weakref.WeakSet()
+
+
+def configurar_log(caminho):
+    """Grava cada etapa medida como uma linha JSON em 'caminho' ('-' para o stderr)."""
+    if not caminho or any(getattr(h, 'destino', None) == caminho for h in logger.handlers):
+        return
+    handler = logging.StreamHandler() if caminho == '-' else logging.FileHandler(caminho, encoding='utf-8')
+    handler.destino = caminho
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _reservar_memoria():
+    global _usuarios_memoria, _memoria_ligada_aqui
+    with _trava_memoria:
+        _usuarios_memoria += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memoria_ligada_aqui = True
+
+
+def _liberar_memoria():
+    global _usuarios_memoria, _memoria_ligada_aqui
+    with _trava_memoria:
+        _usuarios_memoria -= 1
+        if _usuarios_memoria == 0 and _memoria_ligada_aqui:
+            tracemalloc.stop()
+            _memoria_ligada_aqui = False
+
+
+def _zerar_pico():
+    """
+    Zera o pico do tracemalloc sem perder o de ninguém: antes, o pico até aqui
+    fica guardado na etapa aberta de cada Medidor. Chamar com a trava.
+    """
+    pico = tracemalloc.get_traced_memory()[1]
+    for medidor in _medindo:
+        if medidor._pilha:
+            medidor._pilha[-1][2] = max(medidor._pilha[-1][2], pico)
+    tracemalloc.reset_peak()
+
+
+class Medidor:
+    """
+    Registros das etapas de uma execução ('origem' = 'site' ou 'main').
+    Com memoria=True o tracemalloc fica ligado até encerrar() (ou até o Medidor
+    ser descartado, no fim da execução do site).
+    """
+
+    def __init__(self, origem, memoria=False):
+        self.origem = origem
+        self.execucao = uuid.uuid4().hex[:12]
+        self.memoria = memoria
+        self.registros = []
+        # [registro, memória no início, maior pico visto pelas etapas filhas]
+        self._pilha = []
+        self._liberar = weakref.finalize(self, _liberar_memoria) if memoria else None
+        if memoria:
+            _reservar_memoria()
+
+    def encerrar(self):
+        """Devolve o tracemalloc: desligado se nenhum outro Medidor o usa."""
+        if self._liberar is not None:
+            self._liberar()
+        self.memoria = False
+
+    @contextlib.contextmanager
+    def etapa(self, nome, linhas=None):
+        """
+        Mede o bloco. O dicionário devolvido pode receber 'linhas' dentro do bloco,
+        quando a quantidade só é conhecida depois.
+        """
+        registro = {'etapa': nome, 'pai': self._pilha[-1][0]['etapa'] if self._pilha else None,
+                    'nivel': len(self._pilha), 'segundos': None, 'cpu_segundos': None,
+                    'pico_mb': None, 'linhas': linhas}
+        self.registros.append(registro)
+
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+        if medir_memoria:
+            # O pico do tracemalloc é um só no processo: antes de zerá-lo para esta
+            # etapa, o valor até aqui fica guardado nas etapas abertas (desta e das
+            # outras sessões)
+            with _trava_memoria:
+                _zerar_pico()
+                self._pilha.append([registro, tracemalloc.get_traced_memory()[0], 0])
+                _medindo.add(self)
+        else:
+            self._pilha.append([registro, 0, 0])
+
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield registro
+        finally:
+            registro['segundos'] = round(time.perf_counter() - inicio, 6)
+            registro['cpu_segundos'] = round(time.process_time() - inicio_cpu, 6)
+            if medir_memoria:
+                with _trava_memoria:
+                    _, memoria_inicio, pico_filhas = self._pilha.pop()
+                    if tracemalloc.is_tracing():
+                        pico = max(tracemalloc.get_traced_memory()[1], pico_filhas)
+                        registro['pico_mb'] = round((pico - memoria_inicio) / 1024 ** 2, 3)
+                        if self._pilha:
+                            self._pilha[-1][2] = max(self._pilha[-1][2], pico)
+            else:
+                self._pilha.pop()
+            if registro['linhas'] is not None:
+                registro['linhas'] = int(registro['linhas'])
+            if logger.handlers:
+                logger.info(json.dumps({'momento': datetime.now().isoformat(timespec='milliseconds'),
+                                        'origem': self.origem, 'execucao': self.execucao, **registro},
+                                       ensure_ascii=False))
+
+    def medida(self, nome):
+        """Decorador: cada chamada da função vira uma etapa."""
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def medida(*args, **kwargs):
+                with self.etapa(nome):
+                    return funcao(*args, **kwargs)
+            return medida
+        return decorador
+
+    def tabela(self):
+        """Etapas na ordem em que começaram, com o nome recuado pelo aninhamento."""
+        return pd.DataFrame({
+            'Etapa': ["  " * r['nivel'] + r['etapa'] for r in self.registros],
+            'Segundos': [r['segundos'] for r in self.registros],
+            'CPU (s)': [r['cpu_segundos'] for r in self.registros],
+            'Pico (MB)': [r['pico_mb'] for r in self.registros],
+            'Linhas': pd.array([r['linhas'] for r in self.registros], dtype='Int64'),
+        })
+
+
+def iniciar_perfil():
+    """Liga o cProfile (só na thread atual) até encerrar_perfil."""
+    perfil = cProfile.Profile()
+    perfil.enable()
+    return perfil
+
+
+def encerrar_perfil(perfil, caminho=None, funcoes=25):
+    """
+    Desliga o perfil, grava-o em 'caminho' (abre com pstats ou snakeviz) e devolve
+    o resumo das 'funcoes' com mais tempo acumulado.
+    """
+    perfil.disable()
+    if caminho:
+        perfil.dump_stats(caminho)
+    resumo = io.StringIO()
+    pstats.Stats(perfil, stream=resumo).sort_stats('cumulative').print_stats(funcoes)
+    return resumo.getvalue()
@@ -0,0 +1,358 @@
+"""
+Pipeline dos chamados com dois motores de execução: pandas e Arrow.
+
+As etapas compartilhadas por site.py e main.py - nomes de colunas, conversão de
+datas, SLA, textos, filtros, contagens e agregações por dia e por dimensão -
+estão aqui nos dois motores, com o mesmo resultado. O motor Arrow usa os kernels
+do pyarrow.compute e o Acero (group_by e varredura com filtro), que rodam em
+várias threads; nas consultas, as colunas consultadas são convertidas para o
+Arrow uma vez por dataset (tabela_consulta, guardada por quem chama e passada em
+'tabela') e o filtro é aplicado na varredura, antes de qualquer agregação. Sem a
+tabela, cada consulta converte só as colunas que usa. A saída é sempre pandas,
+que é o que os gráficos usam.
+
+O motor é escolhido em config.MOTOR (variável RELATORIO_MOTOR). As regras de
+cada valor (formatos de data, série do Excel, marcadores de vazio) vêm de
+datas.py nos dois motores; só muda quem percorre as colunas.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from config import MOTOR
+from datas import converter_datas, eh_vazio
+from esquema import (COLUNAS_CATEGORICAS, COLUNAS_DATA, COLUNAS_SLA, aplicar_esquema, normalizar_colunas_mistas,
+                     registrar_datas_invalidas)
+
+MOTORES = ('pandas', 'arrow')
+
+# SLA derivado de cada par de datas: (coluna, data final, data inicial)
+SLAS = [('SLA_Solucao_Horas', 'Data Finalizado', 'Data Abertura'),
+        ('SLA_Resposta_Horas', 'Primeiro Retorno', 'Data Abertura')]
+
+
+def resolver_motor(motor=None):
+    """Nome do motor a usar ('pandas' ou 'arrow'); None usa o da configuração."""
+    motor = (motor or MOTOR).lower()
+    if motor not in MOTORES:
+        raise ValueError(f"Motor '{motor}' desconhecido. Use um destes: {', '.join(MOTORES)}.")
+    return motor
+
+
+# Colunas lidas pelos filtros, pelas contagens e pelo cubo
+COLUNAS_CONSULTA = ['Data_Dia', 'Status', 'Prioridade', 'Subcategoria', 'SLA_Solucao_Horas', 'SLA_Resposta_Horas']
+
+
+def tabela_consulta(df, colunas=COLUNAS_CONSULTA):
+    """Colunas consultadas como tabela Arrow: converta uma vez e passe em 'tabela'."""
+    return pa.Table.from_pandas(df[[c for c in colunas if c in df.columns]], preserve_index=False)
+
+
+def _tabela(df, colunas, linhas=None, tabela=None):
+    """Só as colunas pedidas (e as linhas, se informadas) como tabela Arrow."""
+    if tabela is not None and all(c in tabela.column_names for c in colunas):
+        tabela = tabela.select(colunas)
+        return tabela if linhas is None else tabela.take(linhas)
+    if linhas is not None:
+        df = df.take(linhas)
+    return pa.Table.from_pandas(df[colunas], preserve_index=False)
+
+
+# ---------------------------------------------------------
+# LIMPEZA
+# ---------------------------------------------------------
+def limpar(df, motor=None):
+    """Tratamento padrão dos chamados: nomes de colunas, datas, SLA, textos e tipos do esquema."""
+    if resolver_motor(motor) == 'arrow':
+        return _limpar_arrow(df)
+    return _limpar_pandas(df)
+
+
+def _limpar_pandas(df):
+    df.columns = df.columns.str.strip() # Remove espaços dos nomes das colunas
+
+    # ---------------------------------------------------------
+    # 1. CONVERSÃO DE DATAS
+    # ---------------------------------------------------------
+    # Formato brasileiro (28/11), série do Excel, ISO; '-' vira NaT (datas.py)
+    # Quantos valores preenchidos não viraram data (e em quais linhas) fica nos df.attrs
+    invalidas = {}
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            df[col], invalidas[col] = converter_datas(df[col], posicoes=True)
+
+    # ---------------------------------------------------------
+    # 2. CÁLCULO DE SLA (EM HORAS)
+    # ---------------------------------------------------------
+    # Solução (Data Finalizado - Data Abertura) e 1ª resposta (Primeiro Retorno - Data Abertura),
+    # em horas corridas (float)
+    for sla, fim, inicio in SLAS:
+        if fim in df.columns and inicio in df.columns:
+            df[sla] = (df[fim] - df[inicio]).dt.total_seconds() / 3600
+
+    # ---------------------------------------------------------
+    # 3. TRATAMENTO DE TEXTO
+    # ---------------------------------------------------------
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+
+    # ---------------------------------------------------------
+    # 4. COLUNAS MISTAS
+    # ---------------------------------------------------------
+    normalizar_colunas_mistas(df)
+
+    # ---------------------------------------------------------
+    # 5. TIPOS COMPACTOS (categóricos, dia como datetime64, SLA em float32)
+    # ---------------------------------------------------------
+    registrar_datas_invalidas(df, invalidas)  # vai junto no snapshot (metadados do Arrow)
+    return aplicar_esquema(df)
+
+
+def _texto_arrow(serie):
+    """Coluna de texto como array Arrow (sem cópia quando o pandas já guarda em Arrow)."""
+    if serie.dtype != object and pd.api.types.is_string_dtype(serie.dtype):
+        texto = pa.array(serie, from_pandas=True)
+        return texto.combine_chunks() if isinstance(texto, pa.ChunkedArray) else texto
+    return None
+
+
+def _datas_arrow(serie):
+    """Mesma conversão de converter_datas, com os valores distintos separados pelo Arrow."""
+    texto = _texto_arrow(serie)
+    if texto is None:
+        # Datas do Excel, números de série e colunas mistas
+        datas, invalidos = converter_datas(serie, posicoes=True)
+        return pa.array(datas.to_numpy(), type=pa.timestamp('ns')), invalidos
+
+    codificado = pc.dictionary_encode(texto)
+    distintos = codificado.dictionary.to_numpy(zero_copy_only=False)
+    convertidos, _ = converter_datas(pd.Series(distintos, dtype=object))
+    convertidos = convertidos.to_numpy()
+
+    # Posições das linhas com valor preenchido que não virou data, como no motor pandas
+    indices = codificado.indices.fill_null(-1).to_numpy()
+    falhou = np.isnat(convertidos) & ~eh_vazio(distintos)
+    invalidos = np.flatnonzero((indices >= 0) & falhou[np.maximum(indices, 0)])
+    return pc.take(pa.array(convertidos, type=pa.timestamp('ns')), codificado.indices), invalidos
+
+
+def _categorica_arrow(serie):
+    """astype(str).str.strip() + astype('category'), com as categorias em ordem alfabética."""
+    texto = _texto_arrow(serie)
+    if texto is None:
+        # Números e colunas mistas: o texto sai do str() do pandas
+        texto = pa.array(serie.astype(str), from_pandas=True)
+    codificado = pc.dictionary_encode(pc.utf8_trim_whitespace(texto))
+
+    ordem = pc.sort_indices(codificado.dictionary).to_numpy()
+    posicao = np.empty(len(ordem), dtype='int32')
+    posicao[ordem] = np.arange(len(ordem), dtype='int32')
+    codigos = codificado.indices.fill_null(-1).to_numpy().astype('int32')
+    codigos = np.where(codigos >= 0, posicao[np.maximum(codigos, 0)], -1)
+    categorias = pd.Index(codificado.dictionary.take(pa.array(ordem)).to_numpy(zero_copy_only=False), dtype='str')
+    return pd.Categorical.from_codes(codigos, categories=categorias)
+
+
+def _limpar_arrow(df):
+    # Mesmas etapas e mesma ordem de colunas de _limpar_pandas; as colunas que a
+    # limpeza não toca ficam como vieram do pandas
+    df.columns = df.columns.str.strip()
+
+    # 1. Datas: cada valor distinto convertido uma vez (dicionário do Arrow)
+    invalidas, datas = {}, {}
+    for col in COLUNAS_DATA:
+        if col in df.columns:
+            datas[col], invalidas[col] = _datas_arrow(df[col])
+            df[col] = datas[col].to_numpy(zero_copy_only=False)
+
+    # 2. SLA em horas: nanossegundos / 1e9 / 3600, na mesma ordem de operações do pandas
+    for sla, fim, inicio in SLAS:
+        if fim in datas and inicio in datas:
+            duracao = pc.cast(pc.subtract(datas[fim], datas[inicio]), pa.int64())
+            nanossegundos = pc.cast(duracao, pa.float64(), safe=False)  # como o int64 -> float64 do numpy
+            df[sla] = pc.divide(pc.divide(nanossegundos, 1e9), 3600.0).to_numpy(zero_copy_only=False)
+
+    # 3. Textos das colunas categóricas, já como category
+    for col in COLUNAS_CATEGORICAS:
+        if col in df.columns:
+            df[col] = _categorica_arrow(df[col])
+
+    # 4. Colunas mistas
+    normalizar_colunas_mistas(df)
+
+    # 5. Tipos compactos (as categóricas já estão prontas)
+    registrar_datas_invalidas(df, invalidas)
+    if 'Data Abertura' in datas:
+        df['Data_Dia'] = pc.floor_temporal(datas['Data Abertura'], unit='day').to_numpy(zero_copy_only=False)
+    for col in COLUNAS_SLA:
+        if col in df.columns:
+            df[col] = df[col].astype('float32')
+    return df
+
+
+# ---------------------------------------------------------
+# FILTROS
+# ---------------------------------------------------------
+def filtrar(df, periodo=None, prioridades=None, status=None, motor=None, tabela=None):
+    """
+    Aplica os filtros da barra lateral e devolve as posições (índices inteiros)
+    das linhas selecionadas, sem copiar o DataFrame. 'tabela' é a do
+    tabela_consulta(df), usada pelo motor Arrow.
+    """
+    usar_periodo = 'Data_Dia' in df.columns and periodo is not None and len(periodo) == 2
+    usar_prioridades = 'Prioridade' in df.columns and bool(prioridades)
+    usar_status = 'Status' in df.columns and bool(status)
+
+    if resolver_motor(motor) == 'arrow':
+        return _filtrar_arrow(df, periodo if usar_periodo else None,
+                              prioridades if usar_prioridades else None, status if usar_status else None, tabela)
+
+    mascara = np.ones(len(df), dtype=bool)
+
+    if usar_periodo:
+        inicio, fim = pd.Timestamp(periodo[0]), pd.Timestamp(periodo[1])
+        mascara &= df['Data_Dia'].between(inicio, fim).to_numpy()
+
+    # Nas colunas categóricas o isin compara códigos inteiros, não strings
+    if usar_prioridades:
+        mascara &= df['Prioridade'].isin(prioridades).to_numpy()
+
+    if usar_status:
+        mascara &= df['Status'].isin(status).to_numpy()
+
+    return np.flatnonzero(mascara)
+
+
+def _filtrar_arrow(df, periodo, prioridades, status, tabela=None):
+    colunas = [c for c, usada in [('Data_Dia', periodo), ('Prioridade', prioridades), ('Status', status)]
+               if usada is not None]
+    if not colunas:
+        return np.arange(len(df))
+    tabela = _tabela(df, colunas, tabela=tabela)
+
+    condicoes = []
+    if periodo is not None:
+        tipo = tabela.schema.field('Data_Dia').type
+        inicio, fim = (pa.scalar(pd.Timestamp(d)).cast(tipo) for d in periodo)
+        condicoes += [pc.field('Data_Dia') >= inicio, pc.field('Data_Dia') <= fim]
+    for coluna, valores in [('Prioridade', prioridades), ('Status', status)]:
+        if valores is None:
+            continue
+        tipo = tabela.schema.field(coluna).type
+        if pa.types.is_dictionary(tipo):
+            tipo = tipo.value_type
+        if pa.types.is_null(tipo):
+            return np.arange(0)  # coluna sem nenhum valor: nada passa no filtro
+        condicoes.append(pc.field(coluna).isin(pa.array([str(v) for v in valores]).cast(tipo)))
+
+    tabela = tabela.append_column('__posicao', pa.array(np.arange(len(df))))
+    filtro = condicoes[0]
+    for condicao in condicoes[1:]:
+        filtro = filtro & condicao
+    # Varredura em paralelo: só a coluna de posições sai do filtro
+    selecionadas = ds.dataset(tabela).to_table(columns=['__posicao'], filter=filtro)
+    return np.sort(selecionadas['__posicao'].to_numpy())
+
+
+# ---------------------------------------------------------
+# CONTAGENS E AGREGAÇÕES
+# ---------------------------------------------------------
+def contar_valores(df, coluna, linhas=None, motor=None, tabela=None):
+    """
+    Chamados por valor da coluna (rótulos como texto), na ordem em que cada valor
+    aparece pela primeira vez. Vazios e valores sem chamados ficam de fora.
+    """
+    if resolver_motor(motor) == 'arrow':
+        contagem = pc.value_counts(_tabela(df, [coluna], linhas, tabela)[coluna])
+        valores, qtd = contagem.field('values'), contagem.field('counts').to_numpy()
+        validos = valores.is_valid().to_numpy(zero_copy_only=False)
+        if pa.types.is_dictionary(valores.type):
+            valores = valores.dictionary_decode()
+        rotulos = [str(v) for v in valores.to_pylist()]
+        return pd.Series(qtd[validos], index=pd.Index(np.asarray(rotulos, dtype=object)[validos], dtype='str'),
+                         dtype='int64')
+
+    serie = df[coluna] if linhas is None else df[coluna].take(linhas)
+    codigos, valores = pd.factorize(serie)
+    qtd = np.bincount(codigos[codigos >= 0], minlength=len(valores))
+    return pd.Series(qtd, index=pd.Index(valores.astype(str), dtype='str'), dtype='int64')
+
+
+def contar_por_dia(df, linhas=None, motor=None, tabela=None):
+    """Chamados por dia de abertura (Data_Dia), em ordem de data; dias sem data válida ficam de fora."""
+    if resolver_motor(motor) == 'arrow':
+        por_dia = (_tabela(df, ['Data_Dia'], linhas, tabela).group_by('Data_Dia', use_threads=True)
+                   .aggregate([([], 'count_all')]).filter(pc.field('Data_Dia').is_valid())
+                   .sort_by('Data_Dia'))
+        indice = pd.DatetimeIndex(por_dia['Data_Dia'].to_numpy(), name='Data_Dia')
+        return pd.Series(por_dia['count_all'].to_numpy(), index=indice, dtype='int64')
+
+    datas = df['Data_Dia'] if linhas is None else df['Data_Dia'].take(linhas)
+    por_dia = datas.groupby(datas).size()
+    por_dia.name = None  # como df.groupby('Data_Dia').size()
+    return por_dia
+
+
+def agrupar(df, chaves, medidas, motor=None, tabela=None):
+    """
+    Agrega 'medidas' por combinação das 'chaves' (vazios formam grupo próprio).
+    'medidas' é uma lista de (nome, coluna, operação), com operação 'qtd' (linhas
+    do grupo), 'soma' (em float64), 'validos' (não vazios) ou 'max'. Devolve um
+    DataFrame com as chaves e as medidas, ordenado pelas chaves como o groupby.
+    """
+    if resolver_motor(motor) == 'arrow':
+        return _agrupar_arrow(df, chaves, medidas, tabela)
+
+    colunas, agregacoes = {}, {}
+    for nome, coluna, operacao in medidas:
+        if operacao == 'qtd':
+            colunas[nome] = 1
+        elif operacao == 'soma':
+            colunas[nome] = df[coluna].astype('float64')  # soma em float64 para não acumular o erro do float32
+        elif operacao == 'validos':
+            colunas[nome] = df[coluna].notna().astype('int64')
+        else:
+            colunas[nome] = df[coluna]
+        agregacoes[nome] = 'max' if operacao == 'max' else 'sum'
+
+    valores = pd.DataFrame(colunas, index=df.index)
+    # dropna=False mantém os chamados sem data válida (contam quando não há filtro de período)
+    return valores.groupby([df[c] for c in chaves], observed=True, dropna=False).agg(agregacoes).reset_index()
+
+
+def _agrupar_arrow(df, chaves, medidas, tabela=None):
+    colunas = list(dict.fromkeys(chaves + [coluna for _, coluna, operacao in medidas if operacao != 'qtd']))
+    tabela = _tabela(df, colunas, tabela=tabela)
+
+    agregacoes, nomes = [], {}
+    for nome, coluna, operacao in medidas:
+        if operacao == 'qtd':
+            agregacoes.append(([], 'count_all'))
+            nomes['count_all'] = nome
+        elif operacao == 'soma':
+            tabela = tabela.append_column(f'__{nome}', pc.cast(tabela[coluna], pa.float64()))
+            agregacoes.append((f'__{nome}', 'sum', pc.ScalarAggregateOptions(min_count=0)))
+            nomes[f'__{nome}_sum'] = nome
+        elif operacao == 'validos':
+            agregacoes.append((coluna, 'count', pc.CountOptions(mode='only_valid')))
+            nomes[f'{coluna}_count'] = nome
+        else:
+            agregacoes.append((coluna, 'max'))
+            nomes[f'{coluna}_max'] = nome
+
+    grupos = tabela.group_by(chaves, use_threads=True).aggregate(agregacoes).to_pandas()
+    grupos = grupos.rename(columns=nomes)[chaves + [nome for nome, _, _ in medidas]]
+
+    # Mesmas categorias e mesma ordem de linhas do groupby do pandas
+    for c in chaves:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            grupos[c] = pd.Categorical(grupos[c], categories=df[c].cat.categories)
+    for nome, coluna, operacao in medidas:
+        if operacao == 'max':
+            grupos[nome] = grupos[nome].astype(df[coluna].dtype)
+        elif operacao in ('qtd', 'validos'):
+            grupos[nome] = grupos[nome].astype('int64')
+    return grupos.sort_values(chaves, na_position='last', kind='stable').reset_index(drop=True)
@@ -0,0 +1,96 @@
+"""
+Esboços de quantis do SLA, mescláveis entre grupos e entre arquivos.
+
+Cada valor de SLA cai num balde logarítmico (mesma ideia do DDSketch): o balde k
+cobre (γ^(k-1), γ^k] com γ = (1 + α) / (1 - α), e o valor devolvido para o balde
+fica a no máximo α (1%) de qualquer valor dentro dele. O esboço de um grupo é só
+a contagem por balde, então juntar grupos, dias ou planilhas é somar contagens.
+
+O esboço é montado no carregamento por dia x Status x Prioridade x Subcategoria
+(as mesmas dimensões do cubo) e qualquer combinação de filtros é respondida
+somando os baldes das células selecionadas, sem reordenar os chamados.
+"""
+import numpy as np
+import pandas as pd
+
+from cubo import DIMENSOES
+
+ALFA = 0.01  # erro relativo máximo dos quantis
+GAMA = (1 + ALFA) / (1 - ALFA)
+MENOR_VALOR = 1e-3  # em horas; abaixo disso (em módulo) o valor conta como zero
+
+# Chaves ordenadas como os valores: negativos < zero < positivos
+CHAVE_ZERO = -(1 << 20)
+BASE_NEGATIVOS = -(1 << 24)
+
+QUANTIS = [0.5, 0.9, 0.95, 0.99]
+MEDIDAS = [('SLA_Solucao_Horas', 'Solucao'), ('SLA_Resposta_Horas', 'Resposta')]
+
+
+def chaves_baldes(valores):
+    """Balde de cada valor (NaN deve ser removido antes)."""
+    valores = np.asarray(valores, dtype='float64')
+    modulo = np.maximum(np.abs(valores), MENOR_VALOR)
+    k = np.ceil(np.log(modulo) / np.log(GAMA)).astype('int64')
+    return np.where(np.abs(valores) < MENOR_VALOR, CHAVE_ZERO,
+                    np.where(valores > 0, k, BASE_NEGATIVOS - k))
+
+
+def valores_baldes(chaves):
+    """Valor representativo de cada balde (erro relativo <= ALFA)."""
+    chaves = np.asarray(chaves, dtype='int64')
+    k = np.where(chaves > CHAVE_ZERO, chaves, BASE_NEGATIVOS - chaves)
+    modulo = 2 * GAMA ** k.astype('float64') / (GAMA + 1)
+    return np.where(chaves == CHAVE_ZERO, 0.0, np.where(chaves > CHAVE_ZERO, modulo, -modulo))
+
+
+def construir_esbocos(df):
+    """
+    Contagem de chamados por balde de SLA em cada combinação das dimensões.
+    Devolve {'Solucao': DataFrame, 'Resposta': DataFrame} com as dimensões,
+    'Chave' e 'Qtd' (só as medidas presentes no df).
+    """
+    dimensoes = [c for c in DIMENSOES if c in df.columns]
+    esbocos = {}
+    for col, nome in MEDIDAS:
+        if col not in df.columns:
+            continue
+        validos = df[col].notna().to_numpy()
+        chaves = [df[c][validos] for c in dimensoes]
+        baldes = pd.Series(chaves_baldes(df[col].to_numpy()[validos]), index=df.index[validos], name='Chave')
+        esbocos[nome] = (baldes.groupby(chaves + [baldes], observed=True, dropna=False).size()
+                         .rename('Qtd').reset_index())
+    return esbocos
+
+
+def nomes_quantis(probabilidades=QUANTIS):
+    """Rótulos das colunas de quantis ('p50', 'p90', ...)."""
+    return [f'p{q * 100:g}' for q in probabilidades]
+
+
+def quantis(fatia, probabilidades=QUANTIS, grupo=None):
+    """
+    Quantis das células selecionadas do esboço. Sem 'grupo', devolve uma Series
+    indexada por 'p50', 'p90'...; com 'grupo' (ex.: 'Prioridade'), um DataFrame com
+    uma linha por valor do grupo, a quantidade 'Chamados' e uma coluna por quantil.
+    """
+    if grupo is None:
+        tabela = quantis(fatia.assign(Todos=0), probabilidades, 'Todos')
+        if tabela.empty:
+            return pd.Series(np.nan, index=nomes_quantis(probabilidades))
+        return tabela.iloc[0].drop('Chamados')
+
+    # Contagem por grupo e balde, em ordem crescente de balde dentro do grupo
+    baldes = fatia.groupby([grupo, 'Chave'], observed=True)['Qtd'].sum()
+    baldes = baldes[baldes > 0].reset_index()
+    por_grupo = baldes.groupby(grupo, observed=True)['Qtd']
+    acumulado = por_grupo.cumsum()
+    total = por_grupo.transform('sum')
+
+    tabela = pd.DataFrame({'Chamados': por_grupo.sum()})
+    for q, nome in zip(probabilidades, nomes_quantis(probabilidades)):
+        # Primeiro balde cuja contagem acumulada passa da posição q * (n - 1)
+        chaves = baldes.loc[acumulado > q * (total - 1)].groupby(grupo, observed=True)['Chave'].first()
+        tabela[nome] = pd.Series(valores_baldes(chaves.to_numpy()), index=chaves.index)
+
+    return tabela.sort_values('Chamados', ascending=False, kind='stable')
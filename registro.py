@@ -0,0 +1,81 @@
+"""
+Registro de datasets compartilhado por todas as sessões do dashboard.
+
+Sessões que enviam a mesma planilha recebem o mesmo dataset (somente leitura:
+nenhum código do dashboard deve alterar os frames recebidos). O registro respeita
+um orçamento de memória e descarta primeiro os datasets usados há mais tempo (LRU),
+medindo o tamanho real de cada dataset em bytes.
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def tamanho_em_bytes(dataset):
+    """
+    Memória ocupada pelo dataset, incluindo o conteúdo das strings. Aceita um
+    DataFrame/Series, um array numpy ou um dicionário com esses objetos.
+    """
+    if isinstance(dataset, dict):
+        return sum(tamanho_em_bytes(valor) for valor in dataset.values())
+    if isinstance(dataset, pd.DataFrame):
+        return int(dataset.memory_usage(deep=True, index=True).sum())
+    if isinstance(dataset, pd.Series):
+        return int(dataset.memory_usage(deep=True, index=True))
+    return int(getattr(dataset, 'nbytes', 0))
+
+
+class RegistroDatasets:
+    def __init__(self, limite_bytes):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()  # chave -> (dataset, bytes)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def obter(self, chave, carregar):
+        """
+        Devolve o dataset da chave. Se não estiver no registro, chama carregar()
+        e guarda o resultado (None não é guardado, para permitir nova tentativa).
+        """
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave][0]
+            self.falhas += 1
+
+        # O carregamento fica fora da trava para não bloquear as outras sessões
+        dataset = carregar()
+        if dataset is None:
+            return None
+
+        with self._trava:
+            if chave not in self._itens:
+                self._itens[chave] = (dataset, tamanho_em_bytes(dataset))
+                self._remover_excedente()
+            self._itens.move_to_end(chave)
+            return self._itens[chave][0]
+
+    def _remover_excedente(self):
+        # Sempre mantém ao menos o dataset mais recente, mesmo acima do limite
+        while len(self._itens) > 1 and self.bytes_residentes > self.limite_bytes:
+            self._itens.popitem(last=False)
+            self.remocoes += 1
+
+    @property
+    def bytes_residentes(self):
+        return sum(tamanho for _, tamanho in self._itens.values())
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'remocoes': self.remocoes,
+                'datasets': len(self._itens),
+                'bytes_residentes': self.bytes_residentes,
+                'limite_bytes': self.limite_bytes,
+            }
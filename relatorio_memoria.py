@@ -0,0 +1,80 @@
+"""
+Relatório de memória: layout antigo (str / date do Python, float64) x esquema tipado.
+
+Gera uma exportação sintética grande com o gerador.py, tratada como no
+carregamento, e compara o consumo das duas representações. Na exportação real o
+Assunto é texto livre e quase único (cerca de 126 mil valores distintos em 200 mil
+chamados); o gerador repete poucos assuntos, então aqui a maior parte recebe um
+complemento próprio do chamado para chegar perto disso. A coluna 'Distintos'
+mostra a cardinalidade: o categórico só economiza quando ela é baixa.
+
+Uso: python relatorio_memoria.py [linhas] [semente]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dados import limpar_chamados
+from esquema import COLUNAS_CATEGORICAS, memoria_por_coluna
+from gerador import gerar_chamados
+
+
+def exportacao_sintetica(linhas, semente=42, assuntos_unicos=0.63):
+    """Exportação do gerador.py já tratada, com Assunto de alta cardinalidade como na real."""
+    rng = np.random.default_rng(semente)
+    bruto = gerar_chamados(linhas, semente)
+    unicos = rng.random(linhas) < assuntos_unicos
+    complemento = pd.Series(rng.integers(0, 10 ** 7, linhas)).map(' - pedido {:07d}'.format)
+    bruto['Assunto'] = bruto['Assunto'].where(~unicos, bruto['Assunto'] + complemento)
+    return limpar_chamados(bruto)
+
+
+def layout_antigo(df):
+    """Reconstrói os tipos que o load_data produzia antes do esquema tipado."""
+    antigo = df.copy()
+    for col in COLUNAS_CATEGORICAS:
+        if col in antigo.columns:
+            antigo[col] = antigo[col].astype(str).astype(object)
+    if 'Data_Dia' in antigo.columns:
+        antigo['Data_Dia'] = antigo['Data_Dia'].dt.date
+    if 'SLA_Solucao_Horas' in antigo.columns:
+        antigo['Tempo_Solucao'] = antigo['Data Finalizado'] - antigo['Data Abertura']
+        antigo['SLA_Solucao_Horas'] = antigo['SLA_Solucao_Horas'].astype('float64')
+    if 'SLA_Resposta_Horas' in antigo.columns:
+        antigo['Tempo_1_Resposta'] = antigo['Primeiro Retorno'] - antigo['Data Abertura']
+        antigo['SLA_Resposta_Horas'] = antigo['SLA_Resposta_Horas'].astype('float64')
+    return antigo
+
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+
+    novo = exportacao_sintetica(linhas, semente)
+    antigo = layout_antigo(novo)
+
+    mem_antigo = memoria_por_coluna(antigo)
+    mem_novo = memoria_por_coluna(novo)
+    colunas = [c for c in mem_antigo.index if c in COLUNAS_CATEGORICAS or c.startswith(('Data_Dia', 'SLA_', 'Tempo_'))]
+
+    mb = 1024 ** 2
+    print(f"Exportação sintética: {linhas:,} chamados\n")
+    print(f"{'Coluna':<22}{'Distintos':>11}{'Antes (MB)':>12}{'Depois (MB)':>13}")
+    for col in colunas:
+        distintos = f"{antigo[col].nunique():,}" if col in COLUNAS_CATEGORICAS else ''
+        depois = mem_novo.get(col, 0) / mb
+        print(f"{col:<22}{distintos:>11}{mem_antigo[col] / mb:>12.1f}{depois:>13.1f}")
+    print(f"{'TOTAL (todas)':<22}{'':>11}{mem_antigo.sum() / mb:>12.1f}{mem_novo.sum() / mb:>13.1f}")
+
+    # Alta cardinalidade: a tabela de rótulos tem quase um valor por chamado, então a
+    # comparação justa é com o texto do pandas (str em Arrow), não com objetos Python
+    for col in COLUNAS_CATEGORICAS:
+        if col in novo.columns and novo[col].cat.categories.size > len(novo) / 2:
+            texto = novo[col].astype('str').memory_usage(deep=True, index=False) / mb
+            print(f"\n{col}: {novo[col].cat.categories.size:,} valores distintos - "
+                  f"categórico {mem_novo[col] / mb:.1f} MB x str {texto:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Série temporal de abertura de chamados com granularidade adaptativa.
+
+As contagens ficam num índice datetime64 e são reagrupadas com resample (hora,
+dia, semana ou mês), escolhendo a granularidade mais fina que cabe no número de
+pontos desejado para o período. Para períodos longos, o LTTB (Largest-Triangle-
+Three-Buckets) reduz os pontos desenhados preservando picos e vales.
+"""
+import numpy as np
+import pandas as pd
+
+# Regra do resample, nome exibido e duração aproximada de cada intervalo
+GRANULARIDADES = {
+    'h': ('Hora', pd.Timedelta(hours=1)),
+    'D': ('Dia', pd.Timedelta(days=1)),
+    'W-MON': ('Semana', pd.Timedelta(weeks=1)),
+    'MS': ('Mês', pd.Timedelta(days=30)),
+}
+ALVO_PONTOS = 200
+MAXIMO_PONTOS = 500
+
+
+def escolher_granularidade(inicio, fim, alvo=ALVO_PONTOS, minima='h'):
+    """Granularidade mais fina (a partir de 'minima') com no máximo 'alvo' intervalos no período."""
+    duracao = pd.Timestamp(fim) - pd.Timestamp(inicio) + pd.Timedelta(days=1)
+    regras = list(GRANULARIDADES)
+    for regra in regras[regras.index(minima):]:
+        if duracao / GRANULARIDADES[regra][1] <= alvo:
+            return regra
+    return regras[-1]
+
+
+def reagrupar(contagens, regra):
+    """
+    Soma as contagens (Series com índice datetime) por intervalo da regra.
+    Intervalos sem chamados entram com zero.
+    """
+    contagens = contagens[contagens.index.notna()]
+    if contagens.empty:
+        return contagens.astype('int64')
+    # Semanas começam na segunda-feira e são rotuladas pelo primeiro dia
+    rotulo = {'label': 'left', 'closed': 'left'} if regra.startswith('W') else {}
+    return contagens.resample(regra, **rotulo).sum().astype('int64')
+
+
+def contar_por_hora(datas):
+    """Chamados por hora cheia a partir dos horários de abertura (datetime64)."""
+    datas = pd.DatetimeIndex(datas)
+    return pd.Series(1, index=datas[datas.notna()]).resample('h').sum()
+
+
+def lttb(x, y, limite=MAXIMO_PONTOS):
+    """
+    Posições dos pontos escolhidos pelo Largest-Triangle-Three-Buckets: mantém o
+    primeiro e o último e, em cada balde, o ponto que forma o maior triângulo com
+    o escolhido antes e a média do balde seguinte.
+    """
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        proximo_fim = bordas[i + 2] if i + 2 < len(bordas) else n
+        media_x = x[fim:proximo_fim].mean() if proximo_fim > fim else x[-1]
+        media_y = y[fim:proximo_fim].mean() if proximo_fim > fim else y[-1]
+        # Área (dobrada) do triângulo anterior -> candidato -> média do próximo balde
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def preparar_serie(contagens, regra, limite=MAXIMO_PONTOS, janela_media=None):
+    """
+    Reagrupa as contagens, calcula a média móvel (opcional, em nº de intervalos)
+    e reduz os pontos com LTTB. Devolve um DataFrame com 'Data', 'Qtd' e,
+    se pedida, 'Média Móvel'.
+    """
+    serie = reagrupar(contagens, regra)
+    tabela = pd.DataFrame({'Data': serie.index, 'Qtd': serie.to_numpy()})
+    if janela_media:
+        # Calculada antes da redução, sobre todos os intervalos
+        tabela['Média Móvel'] = serie.rolling(janela_media, min_periods=1).mean().to_numpy()
+    if len(tabela) > limite:
+        posicoes = lttb(tabela['Data'].to_numpy().astype('int64'), tabela['Qtd'].to_numpy(), limite)
+        tabela = tabela.iloc[posicoes].reset_index(drop=True)
+    return tabela
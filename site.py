@@ -1,8 +1,24 @@
-import streamlit as st
+import os
+import tempfile
+
+import numpy as np
 import pandas as pd
+import streamlit as st
 import plotly.express as px
-from collections import Counter
-import re
+
+from armazem import atualizar_armazem, chave_armazem, ler_armazem
+from config import LIMITE_MEMORIA_MB, LOG_DESEMPENHO
+from cubo import construir_cubo, fatiar, maximo, media, somar_por
+from dados import carregar_varios, chave_chamados, filtrar_chamados
+from esquema import ORDEM_PRIORIDADE
+from incidentes import calcular_assinaturas, detectar_incidentes
+from medicao import Medidor, configurar_log, encerrar_perfil, iniciar_perfil
+from motor import resolver_motor, tabela_consulta
+from quantis import ALFA, construir_esbocos, quantis
+from registro import RegistroDatasets
+from serie_temporal import GRANULARIDADES, contar_por_hora, escolher_granularidade, preparar_serie
+from tabela import TAMANHOS_PAGINA, buscar, contar_paginas, ordenar, pagina
+from texto import analisar_texto, construir_indice
 
 # ---------------------------------------------------------
 # CONFIGURAÇÃO DA PÁGINA
@@ -13,338 +29,503 @@ st.set_page_config(page_title="Dashboard TI", page_icon="💻", layout="wide")
 st.title("📊 Relatório Executivo de Chamados T.I.")
 st.markdown("Visão interativa e analítica dos tickets de suporte.")
 
-# ---------------------------------------------------------
-# FUNÇÃO: ANÁLISE DE TEXTO (NOVA FEATURE)
-# ---------------------------------------------------------
-def analisar_texto(df_alvo, coluna_texto):
-    """
-    Pega uma coluna de texto, limpa palavras comuns (stopwords)
-    e conta a frequência das palavras restantes.
-    """
-    if coluna_texto not in df_alvo.columns:
-        return pd.DataFrame()
-
-    # 1. Juntar todo o texto em uma única string
-    texto_completo = " ".join(df_alvo[coluna_texto].dropna().astype(str).tolist())
-    
-    # 2. Limpeza (deixar minúsculo e remover pontuação/números)
-    texto_limpo = texto_completo.lower()
-    texto_limpo = re.sub(r'[^\w\s]', '', texto_limpo) # remove pontuação
-    texto_limpo = re.sub(r'\d+', '', texto_limpo)     # remove números
-    
-    # 3. Lista de Stopwords (Palavras para ignorar)
-    # Adicione ou remova palavras aqui conforme a necessidade da sua empresa
-    stopwords = [
-        'de', 'a', 'o', 'que', 'e', 'do', 'da', 'em', 'um', 'para', 'é', 'com', 'não', 'uma', 'os', 'no',
-        'se', 'na', 'por', 'mais', 'as', 'dos', 'como', 'mas', 'ao', 'ele', 'das', 'tem', 'à', 'seu', 'sua',
-        'ou', 'ser', 'quando', 'muito', 'nos', 'já', 'está', 'eu', 'também', 'só', 'pelo', 'pela', 'até',
-        'isso', 'ela', 'entre', 'depois', 'sem', 'mesmo', 'aos', 'ter', 'seus', 'quem', 'nas', 'me', 'esse',
-        'eles', 'estão', 'você', 'tinha', 'foram', 'essa', 'num', 'nem', 'suas', 'meu', 'minha', 'têm', 
-        'numa', 'pelos', 'elas', 'havia', 'seja', 'qual', 'será', 'nós', 'tenho', 'lhe', 'deles', 'essas', 
-        'esses', 'pelas', 'este', 'fosse', 'dele', 'fazer', 'consigo', 'novo', 'pra', 'consegue', 'nova', 'errado',
-        # Palavras de "educação" e comuns em emails que não agregam análise técnica
-        'bom', 'dia', 'tarde', 'noite', 'favor', 'att', 'grato', 'obrigado', 'obrigada',
-        'ola', 'olá', 'prezados', 'caro', 'cara',
-        # Palavras genéricas de chamado que não indicam a causa raiz
-        'chamado', 'solicito', 'verificar', 'erro', 'problema', 'ticket', 'abertura', 'gentileza', 'app'
-    ]
-    
-    # 4. Separar palavras e filtrar
-    palavras = texto_limpo.split()
-    # Filtra stopwords e palavras muito curtas (menos de 2 letras)
-    palavras_filtradas = [p for p in palavras if p not in stopwords and len(p) > 2]
-    
-    # 5. Contar frequência
-    contagem = Counter(palavras_filtradas)
-    
-    # Transformar em DataFrame para o gráfico (Top 30 palavras)
-    df_palavras = pd.DataFrame(contagem.most_common(30), columns=['Palavra', 'Frequência'])
-    return df_palavras
-
 # ---------------------------------------------------------
 # CARREGAMENTO E PROCESSAMENTO DE DADOS
 # ---------------------------------------------------------
 st.sidebar.header("📁 Carregar Dados")
-uploaded_file = st.sidebar.file_uploader("Faça upload do Excel (.xlsx)", type=["xlsx"])
-
-if uploaded_file is not None:
-    # Função com cache para não recarregar o Excel a cada clique
-    @st.cache_data
-    def load_data(file):
+uploaded_files = st.sidebar.file_uploader("Faça upload do Excel (.xlsx)", type=["xlsx"], accept_multiple_files=True,
+                                          help="Envie várias exportações (ex.: uma por mês/região) para juntá-las")
+
+# Registro único por processo: sessões que enviam a mesma planilha
+# compartilham o mesmo dataset (DataFrame + estruturas derivadas),
+# dentro do orçamento de memória
+@st.cache_resource
+def obter_registro():
+    return RegistroDatasets(LIMITE_MEMORIA_MB * 1024 * 1024)
+
+registro = obter_registro()
+
+# Medição de desempenho: o toggle do painel fica no fim da barra lateral; o valor
+# lido aqui é o da interação que disparou esta execução, para a carga já ser medida
+painel_desempenho = st.session_state.get('painel_desempenho', False)
+medidor = Medidor('site', memoria=painel_desempenho)
+configurar_log(LOG_DESEMPENHO)
+# Perfil do cProfile de uma única execução, pedido pelo botão do painel
+perfil = iniciar_perfil() if st.session_state.pop('perfilar_execucao', False) else None
+
+def montar_dataset(df, tempos=None):
+    # Cubo pré-agregado, esboços de quantis do SLA, índice de termos e
+    # assinaturas MinHash, montados uma vez por conjunto de planilhas; com o
+    # motor Arrow, as colunas consultadas também viram tabela Arrow uma vez só
+    tabela = None
+    if resolver_motor() == 'arrow':
+        with medidor.etapa("Tabela Arrow", linhas=len(df)):
+            tabela = tabela_consulta(df)
+    with medidor.etapa("Cubo e esboços de SLA", linhas=len(df)):
+        dataset = {'chamados': df, 'tabela_arrow': tabela, 'cubo': construir_cubo(df, tabela=tabela),
+                   'esbocos_sla': construir_esbocos(df), 'tempos_carga': tempos}
+    if 'Assunto' in df.columns:
+        with medidor.etapa("Índice de texto e assinaturas", linhas=len(df)):
+            dataset['indice_texto'] = construir_indice(df['Assunto'])
+            dataset['assinaturas_assunto'] = calcular_assinaturas(df['Assunto'])
+    return dataset
+
+def load_data(conteudos, nomes):
+    try:
+        # Cada planilha é lida em um processo (ou do snapshot colunar em disco);
+        # chamados repetidos entre arquivos são removidos
+        with medidor.etapa("Leitura das planilhas") as etapa:
+            df, tempos = carregar_varios(conteudos, nomes)
+            etapa['linhas'] = len(df)
+        return montar_dataset(df, tempos)
+    except Exception as e:
+        st.error(f"Erro ao ler arquivo: {e}")
+        return None
+
+# Incidentes memorizados por dataset + filtros + parâmetros (entre reruns e sessões);
+# os argumentos com '_' não entram na chave do cache
+@st.cache_data(max_entries=64, show_spinner=False)
+def incidentes_da_selecao(chave_dataset, filtros, limiar, minimo, _df, _assinaturas, _linhas):
+    return detectar_incidentes(_df, _assinaturas, _linhas, limiar=limiar, minimo_chamados=minimo)
+
+# Armazém local: cada exportação diária é integrada ao que já foi tratado,
+# e só os chamados novos ou alterados passam de novo pela limpeza
+usar_armazem = st.sidebar.toggle("💾 Acumular no armazém local",
+                                 help="Integra as exportações ao armazém em disco em vez de ler só os arquivos enviados")
+
+dataset = None
+if usar_armazem:
+    for arquivo in uploaded_files or []:
         try:
-            df = pd.read_excel(file)
-            df.columns = df.columns.str.strip() # Remove espaços dos nomes das colunas
-            
-            # ---------------------------------------------------------
-            # 1. CONVERSÃO DE DATAS
-            # ---------------------------------------------------------
-            cols_data = ['Data Abertura', 'Data Finalizado', 'Primeiro Retorno']
-            
-            for col in cols_data:
-                if col in df.columns:
-                    # dayfirst=True é crucial para datas no formato brasileiro (28/11)
-                    df[col] = pd.to_datetime(df[col], dayfirst=True, errors='coerce')
-
-            # Cria coluna auxiliar apenas com a Data (sem hora) para filtros
-            if 'Data Abertura' in df.columns:
-                df['Data_Dia'] = df['Data Abertura'].dt.date
-
-            # ---------------------------------------------------------
-            # 2. CÁLCULO DE SLA (EM HORAS)
-            # ---------------------------------------------------------
-            # SLA DE SOLUÇÃO (Data Finalizado - Data Abertura)
-            if 'Data Finalizado' in df.columns and 'Data Abertura' in df.columns:
-                df['Tempo_Solucao'] = df['Data Finalizado'] - df['Data Abertura']
-                # Converte para horas corridas (float)
-                df['SLA_Solucao_Horas'] = df['Tempo_Solucao'].dt.total_seconds() / 3600
-
-            # SLA DE 1ª RESPOSTA (Primeiro Retorno - Data Abertura)
-            if 'Primeiro Retorno' in df.columns and 'Data Abertura' in df.columns:
-                df['Tempo_1_Resposta'] = df['Primeiro Retorno'] - df['Data Abertura']
-                df['SLA_Resposta_Horas'] = df['Tempo_1_Resposta'].dt.total_seconds() / 3600
-
-            # ---------------------------------------------------------
-            # 3. TRATAMENTO DE TEXTO
-            # ---------------------------------------------------------
-            cols_texto = ['Status', 'Subcategoria', 'Prioridade', 'PDV', 'Assunto', 'Categoria']
-            for col in cols_texto:
-                 if col in df.columns:
-                    df[col] = df[col].astype(str).str.strip()
-            
-            return df
+            with medidor.etapa(f"Armazém: {arquivo.name}"):
+                resumo = atualizar_armazem(arquivo.getvalue())
         except Exception as e:
-            st.error(f"Erro ao ler arquivo: {e}")
-            return None
-
-    df = load_data(uploaded_file)
-
-    if df is not None:
-        # ---------------------------------------------------------
-        # BARRA LATERAL (FILTROS)
-        # ---------------------------------------------------------
-        st.sidebar.header("🔍 Filtros")
-        
-        # Filtro de Data
-        if 'Data_Dia' in df.columns:
-            min_date = df['Data_Dia'].dropna().min()
-            max_date = df['Data_Dia'].dropna().max()
-            try:
-                date_range = st.sidebar.date_input("Período", [min_date, max_date])
-            except:
-                st.sidebar.warning("Verifique as datas no Excel.")
-                date_range = [min_date, max_date]
-        else:
-            date_range = []
-
-        # Filtro de Prioridade
-        if 'Prioridade' in df.columns:
-            all_priorities = list(df['Prioridade'].unique())
-            selected_priorities = st.sidebar.multiselect("Prioridade", all_priorities, default=all_priorities)
-        else:
-            selected_priorities = []
-
-        # Filtro de Status
-        if 'Status' in df.columns:
-            all_status = list(df['Status'].unique())
-            selected_status = st.sidebar.multiselect("Status", all_status, default=all_status)
-        else:
-            selected_status = []
-
-        # APLICAR FILTROS
-        # Inicia com todos os dados
-        df_filtered = df.copy()
-
-        # Aplica máscaras se as colunas existirem
-        if 'Data_Dia' in df.columns and len(date_range) == 2:
-            mask_date = (df['Data_Dia'] >= date_range[0]) & (df['Data_Dia'] <= date_range[1])
-            df_filtered = df_filtered.loc[mask_date]
-        
-        if 'Prioridade' in df.columns and selected_priorities:
-            df_filtered = df_filtered[df_filtered['Prioridade'].isin(selected_priorities)]
-            
-        if 'Status' in df.columns and selected_status:
-            df_filtered = df_filtered[df_filtered['Status'].isin(selected_status)]
-
-        # ---------------------------------------------------------
-        # DASHBOARD - KPIs
-        # ---------------------------------------------------------
+            st.sidebar.error(f"Erro ao integrar {arquivo.name}: {e}")
+            continue
+        if resumo is not None:
+            st.sidebar.success(f"{arquivo.name}: {resumo['novos']} novos, {resumo['alterados']} alterados, "
+                               f"{resumo['inalterados']} sem mudança ({resumo['total']} no armazém)")
+
+    # A chave muda a cada integração com alterações (e se o armazém for recriado),
+    # invalidando o dataset anterior
+    chave = chave_armazem()
+    if chave:
+        chave_dataset = f"armazem-{chave}"
+        with medidor.etapa("load_data") as etapa:
+            dataset = registro.obter(chave_dataset, lambda: montar_dataset(ler_armazem()))
+            etapa['linhas'] = len(dataset['chamados'])
+elif uploaded_files:
+    conteudos = [arquivo.getvalue() for arquivo in uploaded_files]
+    nomes = [arquivo.name for arquivo in uploaded_files]
+    chave_dataset = "|".join(chave_chamados(conteudo) for conteudo in conteudos)
+    # Com o dataset já no registro, a etapa mede só a consulta
+    with medidor.etapa("load_data") as etapa:
+        dataset = registro.obter(chave_dataset, lambda: load_data(conteudos, nomes))
+        etapa['linhas'] = len(dataset['chamados']) if dataset is not None else None
+
+if dataset is not None:
+    df = dataset['chamados']
+    cubo = dataset['cubo']
+
+    tempos_carga = dataset['tempos_carga']
+    if tempos_carga is not None and len(tempos_carga) > 1:
+        with st.sidebar.expander("⏱️ Tempo de Carga por Arquivo"):
+            st.dataframe(tempos_carga, hide_index=True,
+                         column_config={'Segundos': st.column_config.NumberColumn(format="%.2f")})
+            st.caption(f"{len(df)} chamados únicos após juntar {len(tempos_carga)} arquivos.")
+
+    datas_invalidas = {col: qtd for col, qtd in df.attrs.get('datas_invalidas', {}).items() if qtd}
+    if datas_invalidas:
+        st.sidebar.warning("Valores não reconhecidos como data: " +
+                           ", ".join(f"{col} ({qtd})" for col, qtd in datas_invalidas.items()))
+
+    # ---------------------------------------------------------
+    # BARRA LATERAL (FILTROS)
+    # ---------------------------------------------------------
+    st.sidebar.header("🔍 Filtros")
+    
+    # Filtro de Data
+    if 'Data_Dia' in df.columns:
+        min_date = df['Data_Dia'].min().date()
+        max_date = df['Data_Dia'].max().date()
+        try:
+            date_range = st.sidebar.date_input("Período", [min_date, max_date])
+        except:
+            st.sidebar.warning("Verifique as datas no Excel.")
+            date_range = [min_date, max_date]
+    else:
+        date_range = []
+
+    # Filtro de Prioridade
+    if 'Prioridade' in df.columns:
+        all_priorities = list(df['Prioridade'].unique())
+        selected_priorities = st.sidebar.multiselect("Prioridade", all_priorities, default=all_priorities)
+    else:
+        selected_priorities = []
+
+    # Filtro de Status
+    if 'Status' in df.columns:
+        all_status = list(df['Status'].unique())
+        selected_status = st.sidebar.multiselect("Status", all_status, default=all_status)
+    else:
+        selected_status = []
+
+    # APLICAR FILTROS
+    # As máscaras viram um único vetor de posições; o frame compartilhado
+    # nunca é copiado: cada seção lê só as colunas que usa, nessas posições
+    with medidor.etapa("Filtros: posições", linhas=len(df)):
+        indices_filtrados = filtrar_chamados(df, date_range, selected_priorities, selected_status,
+                                             tabela=dataset['tabela_arrow'])
+    filtros = (tuple(date_range), tuple(selected_priorities), tuple(selected_status))
+
+    # Os mesmos filtros aplicados ao cubo: KPIs e gráficos agregados saem daqui
+    with medidor.etapa("Filtros: cubo", linhas=len(cubo)):
+        fatia = fatiar(cubo, date_range, selected_priorities, selected_status)
+
+    # ---------------------------------------------------------
+    # DASHBOARD - KPIs
+    # ---------------------------------------------------------
+    with medidor.etapa("KPIs", linhas=len(fatia)):
         st.markdown("### Visão Geral")
         col1, col2, col3, col4 = st.columns(4)
-        
-        total_chamados = len(df_filtered)
-        
+    
+        total_chamados = int(fatia['Qtd'].sum())
+    
         # Tenta calcular métricas se as colunas existirem
-        abertos = len(df_filtered[df_filtered['Status'] == 'Aberto']) if 'Status' in df_filtered.columns else 0
-        andamento = len(df_filtered[df_filtered['Status'] == 'Andamento']) if 'Status' in df_filtered.columns else 0
-        finalizados = len(df_filtered[df_filtered['Status'] == 'Finalizado']) if 'Status' in df_filtered.columns else 0
+        por_status = somar_por(fatia, 'Status') if 'Status' in fatia.columns else {}
+        abertos = int(por_status.get('Aberto', 0))
+        andamento = int(por_status.get('Andamento', 0))
+        finalizados = int(por_status.get('Finalizado', 0))
 
         col1.metric("Total Selecionado", total_chamados)
         col2.metric("Em Aberto", abertos, delta_color="inverse")
         col3.metric("Em Andamento", andamento)
         col4.metric("Finalizados", finalizados)
 
-        st.markdown("---")
+    st.markdown("---")
 
-        # ---------------------------------------------------------
-        # DASHBOARD - MÉTRICAS DE SLA (TEMPO)
-        # ---------------------------------------------------------
+    # ---------------------------------------------------------
+    # DASHBOARD - MÉTRICAS DE SLA (TEMPO)
+    # ---------------------------------------------------------
+    with medidor.etapa("SLA", linhas=len(indices_filtrados)):
         st.subheader("⏱️ Performance e SLA (Tempo de Atendimento)")
 
         # Filtra apenas chamados finalizados para não distorcer a média com negativos ou nulos
-        df_finalizados = df_filtered[df_filtered['Status'] == 'Finalizado'].copy()
-
-        if not df_finalizados.empty and 'SLA_Solucao_Horas' in df_finalizados.columns:
-            
+        # (códigos do Status nas posições filtradas; só a coluna de SLA é lida)
+        linhas_finalizados = indices_filtrados[:0]
+        if 'SLA_Solucao_Horas' in df.columns and 'Finalizado' in df['Status'].cat.categories:
+            codigo_finalizado = df['Status'].cat.categories.get_loc('Finalizado')
+            codigos_status = df['Status'].cat.codes.to_numpy()
+            linhas_finalizados = indices_filtrados[codigos_status[indices_filtrados] == codigo_finalizado]
+
+        if len(linhas_finalizados) > 0:
+        
             # --- CÁLCULOS ---
-            media_solucao = df_finalizados['SLA_Solucao_Horas'].mean()
-            mediana_solucao = df_finalizados['SLA_Solucao_Horas'].median()
-            max_solucao = df_finalizados['SLA_Solucao_Horas'].max()
-            
+            # Média e máximo vêm do cubo; a mediana, dos esboços de quantis (erro <= ALFA)
+            fatia_finalizados = fatia[fatia['Status'] == 'Finalizado']
+            media_solucao = media(fatia_finalizados, 'Solucao') or 0
+            max_solucao = maximo(fatia_finalizados, 'Solucao') or 0
+
+            esboco_solucao = fatiar(dataset['esbocos_sla']['Solucao'], date_range, selected_priorities, selected_status)
+            esboco_solucao = esboco_solucao[esboco_solucao['Status'] == 'Finalizado']
+            mediana_solucao = quantis(esboco_solucao)['p50']
+        
             # Se tiver SLA de Resposta calculado
-            media_resposta = 0
-            if 'SLA_Resposta_Horas' in df_filtered.columns:
-                # Aqui usamos df_filtered geral, pois chamados em andamento já podem ter tido resposta
-                df_com_resposta = df_filtered.dropna(subset=['SLA_Resposta_Horas'])
-                if not df_com_resposta.empty:
-                    media_resposta = df_com_resposta['SLA_Resposta_Horas'].mean()
+            # Aqui usamos a seleção geral, pois chamados em andamento já podem ter tido resposta
+            media_resposta = media(fatia, 'Resposta') or 0
 
             # --- EXIBIÇÃO DE METRICAS ---
             c_sla1, c_sla2, c_sla3, c_sla4 = st.columns(4)
 
             c_sla1.metric("Tempo Médio Solução", f"{media_solucao:.1f} horas", help="Média de horas corridas entre Abertura e Finalização")
-            c_sla2.metric("Mediana Solução", f"{mediana_solucao:.1f} horas", help="50% dos chamados são resolvidos em menos que esse tempo")
+            c_sla2.metric("Mediana Solução", f"{mediana_solucao:.1f} horas", help=f"50% dos chamados são resolvidos em menos que esse tempo (±{ALFA:.0%})")
             c_sla3.metric("Tempo Médio 1ª Resposta", f"{media_resposta:.1f} horas", help="Tempo até o primeiro contato do suporte")
             c_sla4.metric("Chamado + Demorado", f"{max_solucao:.1f} horas")
 
             # --- GRÁFICO DE DISTRIBUIÇÃO DO TEMPO ---
             st.markdown("##### 📉 Distribuição do Tempo de Resolução")
-            
+        
             # Histograma para ver a concentração
-            # Limitamos visualmente a 100h ou o maximo para não 'quebrar' o gráfico com outliers extremos
-            fig_hist = px.histogram(df_finalizados, x="SLA_Solucao_Horas", nbins=30, 
-                                    title="Concentração de Chamados por Tempo de Resolução",
-                                    labels={'SLA_Solucao_Horas': 'Horas para Solução'},
-                                    color_discrete_sequence=['#3366CC'])
-            
+            # Agrupado no servidor: só as 30 barras vão para o navegador, não cada chamado
+            valores_sla = df['SLA_Solucao_Horas'].to_numpy()[linhas_finalizados].astype('float64')
+            valores_sla = valores_sla[~np.isnan(valores_sla)]
+            contagem_bins, bordas = np.histogram(valores_sla, bins=30)
+            bins_sla = pd.DataFrame({'SLA_Solucao_Horas': (bordas[:-1] + bordas[1:]) / 2, 'Chamados': contagem_bins})
+            fig_hist = px.bar(bins_sla, x="SLA_Solucao_Horas", y="Chamados",
+                              title="Concentração de Chamados por Tempo de Resolução",
+                              labels={'SLA_Solucao_Horas': 'Horas para Solução'},
+                              color_discrete_sequence=['#3366CC'])
+            fig_hist.update_traces(width=bordas[1] - bordas[0])
+            fig_hist.update_layout(bargap=0)
+
             # Adiciona uma linha vertical na média
             fig_hist.add_vline(x=media_solucao, line_dash="dash", line_color="red", annotation_text="Média")
-            
+        
             st.plotly_chart(fig_hist, width='stretch')
 
+            # --- PERCENTIS POR PRIORIDADE E SUBCATEGORIA ---
+            st.markdown("##### 🎯 Percentis do Tempo de Solução (horas)")
+            st.caption(f"Calculados pelos esboços de quantis: erro relativo de até {ALFA:.0%}.")
+            formato_percentis = {col: st.column_config.NumberColumn(format="%.1f") for col in ['p50', 'p90', 'p95', 'p99']}
+            c_perc1, c_perc2 = st.columns(2)
+            for coluna_st, dimensao in [(c_perc1, 'Prioridade'), (c_perc2, 'Subcategoria')]:
+                if dimensao in esboco_solucao.columns:
+                    with coluna_st:
+                        st.dataframe(quantis(esboco_solucao, grupo=dimensao), width='stretch', column_config=formato_percentis)
+
         else:
             st.info("Não há chamados 'Finalizados' com datas válidas para calcular o SLA nesta seleção.")
 
-        # ---------------------------------------------------------
-        # DASHBOARD - GRÁFICOS LINHA 1
-        # ---------------------------------------------------------
-        col_g1, col_g2 = st.columns(2)
-
-        with col_g1:
-            st.subheader("Onde dói mais? (Top 10 Subcategorias)")
-            if 'Subcategoria' in df_filtered.columns:
-                top_subs = df_filtered['Subcategoria'].value_counts().head(10).reset_index()
-                top_subs.columns = ['Subcategoria', 'Qtd']
-                fig_bar = px.bar(top_subs, x='Qtd', y='Subcategoria', orientation='h', 
-                                 text='Qtd', color='Qtd', color_continuous_scale='Bluered')
-                fig_bar.update_layout(yaxis=dict(autorange="reversed"))
-                st.plotly_chart(fig_bar, width='stretch')
-            else:
-                st.info("Coluna 'Subcategoria' não encontrada.")
-
-        with col_g2:
-            st.subheader("Status dos Chamados")
-            if 'Status' in df_filtered.columns:
-                status_counts = df_filtered['Status'].value_counts().reset_index()
-                status_counts.columns = ['Status', 'Qtd']
-                fig_pie = px.pie(status_counts, values='Qtd', names='Status', hole=0.4, 
-                                 color_discrete_sequence=px.colors.qualitative.Pastel)
-                st.plotly_chart(fig_pie, width='stretch')
-            else:
-                st.info("Coluna 'Status' não encontrada.")
-
-        # ---------------------------------------------------------
-        # DASHBOARD - GRÁFICOS LINHA 2
-        # ---------------------------------------------------------
-        col_g3, col_g4 = st.columns(2)
-
-        with col_g3:
-            st.subheader("Evolução Diária")
-            if 'Data_Dia' in df_filtered.columns:
-                daily_counts = df_filtered.groupby('Data_Dia').size().reset_index(name='Qtd')
-                fig_line = px.line(daily_counts, x='Data_Dia', y='Qtd', markers=True, line_shape='spline')
-                st.plotly_chart(fig_line, width='stretch')
-            else:
-                st.info("Coluna de data não encontrada para montar a linha do tempo.")
-
-        with col_g4:
-            st.subheader("Volume por Prioridade")
-            if 'Prioridade' in df_filtered.columns:
-                # Define ordem lógica se possível
-                ordem = ["Baixa", "Média", "Alta", "Crítica"]
-                fig_col = px.histogram(df_filtered, x='Prioridade', color='Prioridade', 
-                                       category_orders={"Prioridade": ordem})
-                st.plotly_chart(fig_col, width='stretch')
-            else:
-                st.info("Coluna 'Prioridade' não encontrada.")
-
-        # ---------------------------------------------------------
-        # DASHBOARD - ANÁLISE DE TEXTO (COM FILTRO DE SUBCATEGORIA)
-        # ---------------------------------------------------------
+    # ---------------------------------------------------------
+    # DASHBOARD - GRÁFICOS LINHA 1
+    # ---------------------------------------------------------
+    col_g1, col_g2 = st.columns(2)
+
+    with col_g1, medidor.etapa("Gráfico: Top Subcategorias", linhas=len(fatia)):
+        st.subheader("Onde dói mais? (Top 10 Subcategorias)")
+        if 'Subcategoria' in fatia.columns:
+            top_subs = somar_por(fatia, 'Subcategoria').head(10).reset_index()
+            top_subs.columns = ['Subcategoria', 'Qtd']
+            fig_bar = px.bar(top_subs, x='Qtd', y='Subcategoria', orientation='h', 
+                             text='Qtd', color='Qtd', color_continuous_scale='Bluered')
+            fig_bar.update_layout(yaxis=dict(autorange="reversed"))
+            st.plotly_chart(fig_bar, width='stretch')
+        else:
+            st.info("Coluna 'Subcategoria' não encontrada.")
+
+    with col_g2, medidor.etapa("Gráfico: Status", linhas=len(fatia)):
+        st.subheader("Status dos Chamados")
+        if 'Status' in fatia.columns:
+            status_counts = somar_por(fatia, 'Status').reset_index()
+            status_counts.columns = ['Status', 'Qtd']
+            fig_pie = px.pie(status_counts, values='Qtd', names='Status', hole=0.4, 
+                             color_discrete_sequence=px.colors.qualitative.Pastel)
+            st.plotly_chart(fig_pie, width='stretch')
+        else:
+            st.info("Coluna 'Status' não encontrada.")
+
+    # ---------------------------------------------------------
+    # DASHBOARD - GRÁFICOS LINHA 2
+    # ---------------------------------------------------------
+    col_g3, col_g4 = st.columns(2)
+
+    # Granularidade e média móvel só reexecutam o gráfico (st.fragment)
+    @st.fragment
+    @medidor.medida("Seção: Evolução no Tempo")
+    def secao_evolucao(df, fatia, indices_filtrados, date_range):
+        st.subheader("Evolução no Tempo")
+        if 'Data_Dia' not in fatia.columns:
+            st.info("Coluna de data não encontrada para montar a linha do tempo.")
+            return
+        if fatia['Data_Dia'].notna().sum() == 0:
+            st.info("Não há chamados com data válida nesta seleção.")
+            return
+
+        c_ev1, c_ev2 = st.columns(2)
+        nomes_granularidade = {nome: regra for regra, (nome, _) in GRANULARIDADES.items()}
+        escolha = c_ev1.selectbox("Granularidade", ["Automática"] + list(nomes_granularidade))
+        janela_media = c_ev2.number_input("Média móvel (intervalos)", min_value=0, value=0,
+                                          help="0 = sem média móvel")
+
+        # Automática: a mais fina que cabe em ~ALVO_PONTOS intervalos no período selecionado
+        if len(date_range) == 2:
+            inicio, fim = date_range
+        else:
+            inicio, fim = fatia['Data_Dia'].min(), fatia['Data_Dia'].max()
+        minima = 'h' if 'Data Abertura' in df.columns else 'D'
+        regra = escolher_granularidade(inicio, fim, minima=minima) if escolha == "Automática" else nomes_granularidade[escolha]
+        if regra == 'h' and minima != 'h':
+            regra = 'D'
+
+        # Por hora precisa do horário de abertura; do dia em diante o cubo basta
+        if regra == 'h':
+            contagens = contar_por_hora(df['Data Abertura'].to_numpy()[indices_filtrados])
+        else:
+            contagens = fatia.set_index('Data_Dia')['Qtd']
+        serie = preparar_serie(contagens, regra, janela_media=janela_media or None)
+
+        poucos_pontos = len(serie) <= 60
+        fig_line = px.line(serie, x='Data', y=[c for c in ['Qtd', 'Média Móvel'] if c in serie.columns],
+                           markers=poucos_pontos, line_shape='spline' if poucos_pontos else 'linear')
+        fig_line.update_layout(legend_title_text='', yaxis_title='Qtd')
+        st.plotly_chart(fig_line, width='stretch')
+        st.caption(f"Por {GRANULARIDADES[regra][0].lower()} · {len(serie)} pontos")
+
+    with col_g3:
+        secao_evolucao(df, fatia, indices_filtrados, date_range)
+
+    with col_g4, medidor.etapa("Gráfico: Prioridade", linhas=len(fatia)):
+        st.subheader("Volume por Prioridade")
+        if 'Prioridade' in fatia.columns:
+            volume_prioridade = somar_por(fatia, 'Prioridade').reset_index()
+            volume_prioridade['Prioridade'] = volume_prioridade['Prioridade'].astype(str)
+            # Define ordem lógica se possível
+            fig_col = px.bar(volume_prioridade, x='Prioridade', y='Qtd', color='Prioridade', 
+                             category_orders={"Prioridade": ORDEM_PRIORIDADE})
+            st.plotly_chart(fig_col, width='stretch')
+        else:
+            st.info("Coluna 'Prioridade' não encontrada.")
+
+    # ---------------------------------------------------------
+    # DASHBOARD - ANÁLISE DE TEXTO (COM FILTRO DE SUBCATEGORIA)
+    # ---------------------------------------------------------
+    # Seção isolada (st.fragment): trocar a subcategoria ou os bigramas reexecuta
+    # só esta função, com os argumentos da última execução completa
+    @st.fragment
+    @medidor.medida("Seção: Mineração de Texto")
+    def secao_texto(df, dataset, fatia, indices_filtrados):
         st.markdown("---")
         st.subheader("🕵️ Mineração de Texto: Do que os chamados falam?")
-        
+    
         # Verifica se as colunas necessárias existem
-        if 'Assunto' in df_filtered.columns and 'Subcategoria' in df_filtered.columns:
-            
+        if 'Assunto' in df.columns and 'Subcategoria' in df.columns:
+        
             # 1. Cria uma lista de subcategorias presentes nos dados filtrados
-            opcoes_sub = sorted(df_filtered['Subcategoria'].unique().astype(str).tolist())
+            opcoes_sub = somar_por(fatia, 'Subcategoria').index.astype(str).sort_values().tolist()
             opcoes_sub.insert(0, "Todas as Subcategorias") # Adiciona opção padrão
-            
+        
             # 2. Cria o Selectbox para o usuário escolher o foco
             col_sel1, col_sel2 = st.columns([1, 2])
             with col_sel1:
                 filtro_texto = st.selectbox("🔎 Filtrar análise de texto por:", options=opcoes_sub)
-            
-            # 3. Aplica o filtro localmente (apenas para este gráfico)
+            with col_sel2:
+                usar_bigramas = st.checkbox("Incluir pares de palavras (bigramas)", value=False)
+        
+            # 3. Aplica o filtro localmente (apenas para este gráfico), sobre as posições
             if filtro_texto != "Todas as Subcategorias":
-                df_texto_analise = df_filtered[df_filtered['Subcategoria'] == filtro_texto]
+                codigo_sub = df['Subcategoria'].cat.categories.get_loc(filtro_texto)
+                codigos_sub = df['Subcategoria'].cat.codes.to_numpy()
+                linhas_texto = indices_filtrados[codigos_sub[indices_filtrados] == codigo_sub]
                 mensagem_contexto = f"Exibindo termos mais comuns em chamados de: **{filtro_texto}**"
             else:
-                df_texto_analise = df_filtered
+                linhas_texto = indices_filtrados
                 mensagem_contexto = "Exibindo termos mais comuns em **todos** os chamados filtrados."
-            
+        
             st.markdown(mensagem_contexto)
 
-            # 4. Gera a análise com o dataframe focado
-            df_palavras = analisar_texto(df_texto_analise, 'Assunto')
-            
+            # 4. Soma os termos do índice apenas nas linhas selecionadas
+            df_palavras = analisar_texto(dataset['indice_texto'], linhas_texto, bigramas=usar_bigramas)
+        
             if not df_palavras.empty:
                 # Gráfico de barras
                 fig_word = px.bar(df_palavras, x='Palavra', y='Frequência', 
                                   text='Frequência', color='Frequência',
                                   color_continuous_scale='Tealgrn',
                                   title=f"Palavras-chave em: {filtro_texto}")
-                
+            
                 fig_word.update_layout(xaxis_tickangle=-45)
                 st.plotly_chart(fig_word, width='stretch')
             else:
                 st.warning(f"Não há dados de texto suficientes para analisar em '{filtro_texto}'.")
 
-        elif 'Assunto' in df_filtered.columns:
+        elif 'Assunto' in df.columns:
             # Fallback caso não exista a coluna Subcategoria, mas exista Assunto
             st.info("Coluna 'Subcategoria' não encontrada para agrupamento. Mostrando geral.")
-            df_palavras = analisar_texto(df_filtered, 'Assunto')
+            df_palavras = analisar_texto(dataset['indice_texto'], indices_filtrados)
             if not df_palavras.empty:
                 fig_word = px.bar(df_palavras, x='Palavra', y='Frequência', color='Frequência')
                 st.plotly_chart(fig_word, width='stretch')
         else:
             st.error("Coluna 'Assunto' não encontrada no arquivo.")
 
-        # ---------------------------------------------------------
-        # DADOS BRUTOS
-        # ---------------------------------------------------------
+    secao_texto(df, dataset, fatia, indices_filtrados)
+
+    # ---------------------------------------------------------
+    # DASHBOARD - INCIDENTES RECORRENTES (ASSUNTOS PARECIDOS)
+    # ---------------------------------------------------------
+    # Também isolada: o slider e o número mínimo só reexecutam o agrupamento
+    @st.fragment
+    @medidor.medida("Seção: Incidentes")
+    def secao_incidentes(df, dataset, indices_filtrados, chave_dataset, filtros):
+        st.markdown("---")
+        st.subheader("🚨 Incidentes Recorrentes: o mesmo problema com textos diferentes")
+
+        if 'Assunto' in df.columns:
+            col_inc1, col_inc2 = st.columns(2)
+            with col_inc1:
+                limiar_similaridade = st.slider("Similaridade mínima entre assuntos", 0.3, 0.9, 0.5, 0.05,
+                                                help="Fração estimada de trechos de texto em comum (Jaccard)")
+            with col_inc2:
+                minimo_chamados = st.number_input("Mínimo de chamados por incidente", min_value=2, value=3)
+
+            # As assinaturas ficam no dataset; aqui só os assuntos da seleção são agrupados
+            df_incidentes = incidentes_da_selecao(chave_dataset, filtros, limiar_similaridade, minimo_chamados,
+                                                  df, dataset['assinaturas_assunto'], indices_filtrados)
+            if not df_incidentes.empty:
+                st.markdown(f"**{len(df_incidentes)}** grupos de chamados parecidos na seleção.")
+                st.dataframe(df_incidentes, width='stretch', hide_index=True)
+            else:
+                st.info("Nenhum incidente recorrente encontrado nesta seleção.")
+        else:
+            st.error("Coluna 'Assunto' não encontrada no arquivo.")
+
+    secao_incidentes(df, dataset, indices_filtrados, chave_dataset, filtros)
+
+    # ---------------------------------------------------------
+    # DADOS BRUTOS
+    # ---------------------------------------------------------
+    # Paginada no servidor: busca e ordenação sobre as posições filtradas,
+    # e só a página visível é enviada ao navegador
+    @st.fragment
+    @medidor.medida("Seção: Dados Brutos")
+    def secao_dados_brutos(df, indices_filtrados):
         with st.expander("Ver Tabela de Dados Completa"):
-            st.dataframe(df_filtered)
+            c_tab1, c_tab2, c_tab3, c_tab4 = st.columns([3, 2, 1, 1])
+            termo_busca = c_tab1.text_input("Buscar", placeholder="Texto em qualquer coluna (PDV, assunto, ...)")
+            coluna_ordem = c_tab2.selectbox("Ordenar por", ["(ordem original)"] + list(df.columns))
+            decrescente = c_tab3.toggle("Decrescente")
+            tamanho_pagina = c_tab4.selectbox("Linhas por página", TAMANHOS_PAGINA, index=1)
+
+            linhas_tabela = buscar(df, indices_filtrados, termo_busca)
+            if coluna_ordem != "(ordem original)":
+                linhas_tabela = ordenar(df, linhas_tabela, coluna_ordem, crescente=not decrescente)
+
+            total_paginas = contar_paginas(len(linhas_tabela), tamanho_pagina)
+            numero_pagina = min(st.number_input("Página", min_value=1, value=1), total_paginas)
+            st.dataframe(pagina(df, linhas_tabela, numero_pagina, tamanho_pagina))
+            st.caption(f"{len(linhas_tabela)} chamados · página {numero_pagina} de {total_paginas}")
+
+    secao_dados_brutos(df, indices_filtrados)
+
+elif not uploaded_files:
+    st.info("👈 Aguardando upload do arquivo Excel na barra lateral.")
 
-else:
-    st.info("👈 Aguardando upload do arquivo Excel na barra lateral.")
\ No newline at end of file
+# ---------------------------------------------------------
+# DIAGNÓSTICO DO CACHE
+# ---------------------------------------------------------
+with st.sidebar.expander("🧠 Diagnóstico do Cache"):
+    estat = registro.estatisticas()
+    st.metric("Memória Residente", f"{estat['bytes_residentes'] / 1024**2:.1f} MB",
+              help=f"Limite: {estat['limite_bytes'] / 1024**2:.0f} MB")
+    c_cache1, c_cache2 = st.columns(2)
+    c_cache1.metric("Acertos", estat['acertos'])
+    c_cache2.metric("Falhas", estat['falhas'])
+    c_cache1.metric("Remoções", estat['remocoes'])
+    c_cache2.metric("Datasets", estat['datasets'])
+
+# ---------------------------------------------------------
+# PAINEL DE DESEMPENHO
+# ---------------------------------------------------------
+if perfil is not None:
+    caminho_perfil = os.path.join(tempfile.gettempdir(), f"perfil_site_{medidor.execucao}.prof")
+    resumo_perfil = encerrar_perfil(perfil, caminho_perfil)
+    with open(caminho_perfil, "rb") as arquivo_perfil:
+        st.session_state['ultimo_perfil'] = (resumo_perfil, arquivo_perfil.read())
+    os.remove(caminho_perfil)
+
+st.sidebar.toggle("⚡ Performance", key='painel_desempenho',
+                  help="Tempo, CPU, pico de memória e linhas de cada etapa desta execução")
+if painel_desempenho:
+    with st.sidebar.expander("⚡ Desempenho desta execução", expanded=True):
+        st.dataframe(medidor.tabela(), hide_index=True,
+                     column_config={col: st.column_config.NumberColumn(format="%.3f")
+                                    for col in ['Segundos', 'CPU (s)', 'Pico (MB)']})
+        # Seções isoladas reexecutadas sozinhas não redesenham este painel
+        st.caption("Seções reexecutadas sozinhas (granularidade, texto, incidentes, tabela) só entram no log.")
+        if st.button("🧪 Perfilar uma execução (cProfile)"):
+            st.session_state['perfilar_execucao'] = True
+            st.rerun()
+        if 'ultimo_perfil' in st.session_state:
+            resumo_perfil, dados_perfil = st.session_state['ultimo_perfil']
+            st.download_button("Baixar perfil (.prof)", dados_perfil, file_name="perfil_site.prof")
+            st.code(resumo_perfil, language=None)
@@ -0,0 +1,61 @@
+"""
+Snapshots colunares (Arrow IPC / Feather) dos dados já tratados.
+
+A chave de cada snapshot é o hash do conteúdo da planilha somado à versão da
+lógica de limpeza. Assim, a mesma planilha enviada de novo (ou por outra pessoa)
+é lida direto do disco via memory-map, sem passar pelo openpyxl.
+"""
+import hashlib
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from config import PASTA_CACHE
+
+
+def chave_snapshot(conteudo, versao):
+    """Gera a chave do snapshot a partir dos bytes da planilha e da versão da limpeza."""
+    digest = hashlib.sha256(conteudo).hexdigest()[:32]
+    return f"{digest}-v{versao}"
+
+
+def caminho_snapshot(chave):
+    return os.path.join(PASTA_CACHE, f"{chave}.arrow")
+
+
+def ler_snapshot(chave):
+    """Retorna o DataFrame salvo para a chave ou None se não existir (ou estiver corrompido)."""
+    caminho = caminho_snapshot(chave)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        # Arquivo sem compressão: o memory-map evita copiar os buffers na leitura
+        tabela = feather.read_table(caminho, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return tabela.to_pandas()
+
+
+def salvar_snapshot(chave, df):
+    """
+    Grava o DataFrame como Arrow IPC. Falhas (disco cheio, pasta sem permissão,
+    coluna que o Arrow não sabe representar) apenas desativam o cache.
+    """
+    temporario = None
+    try:
+        os.makedirs(PASTA_CACHE, exist_ok=True)
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        # Escreve em arquivo temporário e renomeia para nunca deixar snapshot pela metade
+        fd, temporario = tempfile.mkstemp(dir=PASTA_CACHE, suffix=".tmp")
+        os.close(fd)
+        feather.write_feather(tabela, temporario, compression="uncompressed")
+        os.replace(temporario, caminho_snapshot(chave))
+        temporario = None
+    except (OSError, pa.ArrowException):
+        return False
+    finally:
+        if temporario is not None and os.path.exists(temporario):
+            os.remove(temporario)
+    return True
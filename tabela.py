@@ -0,0 +1,69 @@
+"""
+Tabela de dados brutos paginada no servidor.
+
+Busca e ordenação são feitas aqui, sobre as posições das linhas selecionadas, e
+só a página visível é materializada e enviada ao navegador: o tamanho do que vai
+para a tela depende do tamanho da página, não da quantidade de chamados.
+"""
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+
+
+def buscar(df, linhas, termo):
+    """
+    Mantém as posições cujas colunas de texto contêm o termo (sem diferenciar
+    maiúsculas). Nas colunas categóricas só as categorias são comparadas; um
+    termo numérico também procura valores iguais nas colunas inteiras (ex.: ID).
+    """
+    termo = termo.strip()
+    if not termo:
+        return linhas
+
+    encontrados = np.zeros(len(linhas), dtype=bool)
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = serie.cat.categories.astype(str).str.contains(termo, case=False, regex=False)
+            if categorias.any():
+                codigos = serie.cat.codes.to_numpy()[linhas]
+                encontrados |= np.isin(codigos, np.flatnonzero(categorias))
+        elif pd.api.types.is_string_dtype(serie.dtype):
+            # Só as linhas ainda não encontradas precisam ser comparadas
+            pendentes = np.flatnonzero(~encontrados)
+            if len(pendentes):
+                textos = serie.take(linhas[pendentes])
+                if serie.dtype == object:
+                    textos = textos.astype(str)
+                achou = textos.str.contains(termo, case=False, regex=False, na=False).to_numpy(dtype=bool)
+                encontrados[pendentes[achou]] = True
+        elif pd.api.types.is_integer_dtype(serie.dtype) and termo.isdigit():
+            encontrados |= serie.to_numpy()[linhas] == int(termo)
+    return linhas[encontrados]
+
+
+def ordenar(df, linhas, coluna, crescente=True):
+    """Reordena as posições pela coluna (vazios por último), sem copiar o frame."""
+    if coluna is None or coluna not in df.columns:
+        return linhas
+    valores = df[coluna].take(linhas).reset_index(drop=True)
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        # Pelo rótulo, não pela ordem das categorias (que pode vir da junção de planilhas)
+        posicao_rotulo = np.argsort(np.argsort(valores.cat.categories.astype(str)))
+        codigos = valores.cat.codes.to_numpy()
+        valores = pd.Series(np.where(codigos >= 0, posicao_rotulo[codigos], np.nan))
+    ordem = valores.sort_values(ascending=crescente, kind='stable', na_position='last').index.to_numpy()
+    return linhas[ordem]
+
+
+def contar_paginas(quantidade, tamanho):
+    """Total de páginas (ao menos uma, mesmo sem linhas)."""
+    return max(1, -(-quantidade // tamanho))
+
+
+def pagina(df, linhas, numero, tamanho):
+    """Linhas da página 'numero' (a partir de 1; fora do intervalo vai para a última)."""
+    numero = min(max(1, numero), contar_paginas(len(linhas), tamanho))
+    inicio = (numero - 1) * tamanho
+    return df.take(linhas[inicio:inicio + tamanho])
@@ -0,0 +1,95 @@
+"""
+Mineração de texto do campo 'Assunto'.
+
+Cada assunto distinto é tokenizado uma única vez no carregamento e vira uma
+linha de uma matriz esparsa assunto x termo (entradas não nulas em arrays numpy).
+A contagem de termos para qualquer seleção de chamados é uma soma vetorizada:
+quantos chamados de cada assunto estão na seleção x termos de cada assunto.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from config import ARQUIVO_STOPWORDS
+
+
+def carregar_stopwords(caminho=ARQUIVO_STOPWORDS):
+    """Lê o arquivo de stopwords (uma por linha, '#' para comentários) como set."""
+    with open(caminho, encoding="utf-8") as arquivo:
+        linhas = (linha.split('#', 1)[0].strip().lower() for linha in arquivo)
+        return {linha for linha in linhas if linha}
+
+
+def tokenizar(texto, stopwords):
+    """Minúsculas, sem pontuação e números; descarta stopwords e palavras curtas."""
+    texto_limpo = texto.lower()
+    texto_limpo = re.sub(r'[^\w\s]', '', texto_limpo) # remove pontuação
+    texto_limpo = re.sub(r'\d+', '', texto_limpo)     # remove números
+    # Filtra stopwords e palavras muito curtas (menos de 2 letras)
+    return [p for p in texto_limpo.split() if p not in stopwords and len(p) > 2]
+
+
+def construir_indice(serie, stopwords=None):
+    """
+    Monta o índice de termos (palavras e bigramas) da coluna de texto.
+
+    O índice guarda, por assunto distinto, os ids e as contagens dos termos,
+    além do código do assunto de cada chamado (-1 quando vazio).
+    """
+    if stopwords is None:
+        stopwords = carregar_stopwords()
+
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        assuntos = serie.cat.categories
+    else:
+        codigos, assuntos = pd.factorize(serie)
+
+    vocabulario = {}
+    assunto_ids = []
+    termo_ids = []
+    contagens = []
+    for posicao, assunto in enumerate(assuntos.astype(str)):
+        palavras = tokenizar(assunto, stopwords)
+        bigramas = [f"{a} {b}" for a, b in zip(palavras, palavras[1:])]
+        ids = [vocabulario.setdefault(t, len(vocabulario)) for t in palavras + bigramas]
+        ids, qtds = np.unique(np.array(ids, dtype=np.int32), return_counts=True)
+        assunto_ids.extend([posicao] * len(ids))
+        termo_ids.extend(ids.tolist())
+        contagens.extend(qtds.tolist())
+
+    termos = np.array(list(vocabulario), dtype=object)
+    return {
+        'termos': termos,
+        'bigrama': np.array([' ' in t for t in termos], dtype=bool),
+        'n_assuntos': len(assuntos),
+        # Entradas não nulas da matriz assunto x termo
+        'assunto_ids': np.array(assunto_ids, dtype=np.int32),
+        'termo_ids': np.array(termo_ids, dtype=np.int32),
+        'contagens': np.array(contagens, dtype=np.int32),
+        'codigos': np.asarray(codigos, dtype=np.int32),
+    }
+
+
+def analisar_texto(indice, linhas=None, bigramas=False, top=30):
+    """
+    Conta a frequência dos termos nos chamados selecionados (posições em 'linhas';
+    None = todos) e devolve o Top N como DataFrame para o gráfico.
+    """
+    codigos = indice['codigos'] if linhas is None else indice['codigos'][linhas]
+    codigos = codigos[codigos >= 0]
+
+    chamados_por_assunto = np.bincount(codigos, minlength=indice['n_assuntos'])
+
+    # Peso de cada entrada da matriz = nº de chamados daquele assunto x contagem do termo
+    pesos = chamados_por_assunto[indice['assunto_ids']] * indice['contagens']
+    frequencia = np.bincount(indice['termo_ids'], weights=pesos, minlength=len(indice['termos']))
+
+    if not bigramas:
+        frequencia[indice['bigrama']] = 0
+
+    ordem = np.argsort(-frequencia, kind='stable')[:top]
+    ordem = ordem[frequencia[ordem] > 0]
+    return pd.DataFrame({'Palavra': indice['termos'][ordem],
+                         'Frequência': frequencia[ordem].astype(np.int64)})